@@ -0,0 +1,291 @@
+# benchmarks/engine_benchmark.py
+# Бенчмарк ExecutionManager на синтетических графах из Add/Multiply нод.
+# Dear PyGui заменяется заглушкой, граф выполняется через HeadlessEngine.
+#
+# Запуск из корня проекта:
+#   python -m benchmarks.engine_benchmark --shapes chain,fanout,diamond,random \
+#       --sizes 100,1000 --modes serial,parallel,fused --ticks 200 --output bench.json
+#
+# Результат — JSON: {"meta": {...}, "results": [{shape, size, mode, ticks_per_sec,
+# latency_ms: {p50, p90, p99, max, mean}, memory: {...}, propagation: {...}, ...}]}
+
+from nodes import dpg_stub
+
+dpg_stub.install()
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from nodes.headless import HeadlessEngine
+from nodes.log import configure_logging
+from nodes.math_nodes.math_simple import AddNode, MultiplyNode
+
+SHAPES = ("chain", "fanout", "diamond", "random")
+MODES = ("serial", "parallel", "fused")
+
+
+# --- Синтетические графы ---
+# Каждый построитель возвращает список входов-источников [(node_id, key)],
+# которые бенчмарк меняет перед каждым тактом.
+
+def _add_node(engine, index, multiply_b=1.0):
+    """Чётные ноды — Add, нечётные — Multiply; вход b по умолчанию — константа."""
+    if index % 2 == 0:
+        node_id = engine.add_node(AddNode(parent=None))
+        engine.set_input(node_id, "b", 1.0)
+    else:
+        node_id = engine.add_node(MultiplyNode(parent=None))
+        engine.set_input(node_id, "b", multiply_b)
+    engine.set_input(node_id, "a", 0.0)
+    return node_id
+
+
+def build_chain(engine, size, rng):
+    """n0 -> n1 -> ... -> n(size-1)"""
+    ids = [_add_node(engine, 0)]
+    for index in range(1, size):
+        ids.append(_add_node(engine, index))
+        engine.connect(ids[-2], "result", ids[-1], "a")
+    return [(ids[0], "a")]
+
+
+def build_fanout(engine, size, rng):
+    """Один источник и size-1 получателей его выхода."""
+    root = _add_node(engine, 0)
+    for index in range(1, size):
+        engine.connect(root, "result", _add_node(engine, index), "a")
+    return [(root, "a")]
+
+
+def build_diamond(engine, size, rng):
+    """Цепочка ромбов: S -> (L, R) -> J, где J — источник следующего ромба."""
+    source = _add_node(engine, 0)
+    first = source
+    count = 1
+    while count + 3 <= size:
+        left = _add_node(engine, 1)
+        right = _add_node(engine, 3)
+        join = _add_node(engine, 0)
+        engine.connect(source, "result", left, "a")
+        engine.connect(source, "result", right, "a")
+        engine.connect(left, "result", join, "a")
+        engine.connect(right, "result", join, "b")
+        source = join
+        count += 3
+    return [(first, "a")]
+
+
+def build_random(engine, size, rng, link_b_probability=0.5):
+    """Случайный DAG: вход a каждой ноды связан с одной из предыдущих, вход b — с вероятностью."""
+    ids = [_add_node(engine, 0)]
+    for index in range(1, size):
+        # Multiply с b = 0.5 компенсирует рост значений от Add с двумя связями
+        node_id = _add_node(engine, index, multiply_b=0.5)
+        engine.connect(rng.choice(ids), "result", node_id, "a")
+        if index % 2 == 0 and rng.random() < link_b_probability:
+            engine.connect(rng.choice(ids), "result", node_id, "b")
+        ids.append(node_id)
+    return [(ids[0], "a")]
+
+
+BUILDERS = {
+    "chain": build_chain,
+    "fanout": build_fanout,
+    "diamond": build_diamond,
+    "random": build_random,
+}
+
+
+# --- Измерения ---
+def _percentile(sorted_values, percent):
+    """Перцентиль методом ближайшего ранга."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(percent / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def _configure(engine, mode, memo):
+    execution_manager = engine.execution_manager
+    execution_manager.set_memo(memo)
+    if mode == "parallel":
+        execution_manager.set_parallel_execution(True)
+    elif mode == "fused":
+        execution_manager.set_fusion(True)
+
+
+def _run_ticks(engine, sources, ticks, rng):
+    """
+    Меняет входы-источники и выполняет такт. Значения случайные и не повторяются,
+    поэтому memo-кэш не отвечает за ноды вместо process().
+    Возвращает (длительности тактов, число выполненных единиц плана).
+    """
+    latencies = []
+    executed = 0
+    for tick in range(ticks):
+        value = rng.random()
+        for node_id, key in sources:
+            engine.set_input(node_id, key, value)
+        started = time.perf_counter()
+        executed += engine.tick()
+        latencies.append(time.perf_counter() - started)
+    return latencies, executed
+
+
+def run_scenario(shape, size, mode, ticks, seed=0, memo=True, profile_ticks=50):
+    rng = random.Random(seed)
+    gc.collect()
+
+    # Построение графа и первый полный такт — под tracemalloc
+    tracemalloc.start()
+    started = time.perf_counter()
+    engine = HeadlessEngine()
+    _configure(engine, mode, memo)
+    with engine.batch():
+        sources = BUILDERS[shape](engine, size, rng)
+    build_seconds = time.perf_counter() - started
+    engine.run()
+    gc.collect()
+    graph_bytes, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    execution_manager = engine.execution_manager
+    try:
+        # Замеры времени без профилировщика и tracemalloc
+        latencies, executed = _run_ticks(engine, sources, ticks, rng)
+        total = sum(latencies)
+        latencies_ms = sorted(latency * 1000.0 for latency in latencies)
+
+        # Отдельный прогон с профилировщиком: время передачи данных и process()
+        profiler = execution_manager.profiler
+        profiler.reset()
+        profiler.set_enabled(True)
+        _run_ticks(engine, sources, profile_ticks, rng)
+        profiler.set_enabled(False)
+        rows = profiler.snapshot()
+        propagate_ms = sum(row["propagate_ms"] for row in rows)
+        process_ms = sum(row["total_ms"] for row in rows)
+        calls = sum(row["calls"] for row in rows)
+    finally:
+        execution_manager.shutdown()
+
+    return {
+        "shape": shape,
+        "size": size,
+        "mode": mode,
+        "memo": memo,
+        "nodes": len(engine.nodes),
+        "links": len(engine.links),
+        "plan_units": len(execution_manager.plan),
+        "fused_groups": len(execution_manager.plan.groups),
+        "build_s": build_seconds,
+        "ticks": ticks,
+        "ticks_per_sec": ticks / total if total else 0.0,
+        "executed_per_tick": executed / ticks if ticks else 0.0,
+        "latency_ms": {
+            "mean": total * 1000.0 / ticks if ticks else 0.0,
+            "p50": _percentile(latencies_ms, 50),
+            "p90": _percentile(latencies_ms, 90),
+            "p99": _percentile(latencies_ms, 99),
+            "max": latencies_ms[-1] if latencies_ms else 0.0,
+        },
+        "memory": {
+            "graph_bytes": graph_bytes,
+            "peak_bytes": peak_bytes,
+            "bytes_per_node": graph_bytes / max(1, len(engine.nodes)),
+        },
+        "propagation": {
+            "propagate_ms_per_tick": propagate_ms / profile_ticks if profile_ticks else 0.0,
+            "process_ms_per_tick": process_ms / profile_ticks if profile_ticks else 0.0,
+            "propagate_us_per_call": propagate_ms * 1000.0 / calls if calls else 0.0,
+        },
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def _meta(args):
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "ticks": args.ticks,
+        "seed": args.seed,
+        "memo": not args.no_memo,
+    }
+
+
+def _print_summary(results, stream):
+    header = f"{'shape':<8} {'size':>6} {'mode':<9} {'ticks/s':>10} {'p50 ms':>9} {'p99 ms':>9} " \
+             f"{'exec/tick':>9} {'prop ms':>8} {'KiB/node':>9}"
+    print(header, file=stream)
+    for row in results:
+        print(f"{row['shape']:<8} {row['size']:>6} {row['mode']:<9} {row['ticks_per_sec']:>10.1f} "
+              f"{row['latency_ms']['p50']:>9.3f} {row['latency_ms']['p99']:>9.3f} "
+              f"{row['executed_per_tick']:>9.1f} {row['propagation']['propagate_ms_per_tick']:>8.3f} "
+              f"{row['memory']['bytes_per_node'] / 1024:>9.2f}", file=stream)
+
+
+def _csv_list(text, allowed=None):
+    items = [item.strip() for item in text.split(",") if item.strip()]
+    if allowed is not None:
+        unknown = set(items) - set(allowed)
+        if unknown:
+            raise argparse.ArgumentTypeError(f"unknown values: {', '.join(sorted(unknown))}")
+    return items
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the execution engine on synthetic graphs")
+    parser.add_argument("--shapes", type=lambda text: _csv_list(text, SHAPES), default=list(SHAPES),
+                        help=f"Comma-separated graph shapes ({', '.join(SHAPES)})")
+    parser.add_argument("--sizes", type=lambda text: [int(item) for item in _csv_list(text)], default=[100, 1000],
+                        help="Comma-separated node counts (default: 100,1000)")
+    parser.add_argument("--modes", type=lambda text: _csv_list(text, MODES), default=["serial"],
+                        help=f"Comma-separated execution modes ({', '.join(MODES)})")
+    parser.add_argument("--ticks", type=int, default=200, help="Measured ticks per scenario")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for random graphs")
+    parser.add_argument("--no-memo", action="store_true", help="Disable the memo cache of pure nodes")
+    parser.add_argument("--output", default=None, help="Write JSON results to this file (default: stdout)")
+    parser.add_argument("--quiet", action="store_true", help="Do not print the summary table to stderr")
+    args = parser.parse_args(argv)
+    configure_logging("ERROR", console=True)
+
+    results = []
+    for shape in args.shapes:
+        for size in args.sizes:
+            for mode in args.modes:
+                results.append(run_scenario(shape, size, mode, args.ticks, seed=args.seed, memo=not args.no_memo))
+                if not args.quiet:
+                    print(f"done: {shape} {size} {mode}", file=sys.stderr)
+
+    report = {"meta": _meta(args), "results": results}
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+    if not args.quiet:
+        _print_summary(results, sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,18 +2,26 @@
 
 import dearpygui.dearpygui as dpg
 
-from nodes.factory import create_main_interface, center_viewport
+from nodes.factory import create_main_interface, center_viewport, refresh_log_view
+from nodes.log import configure_logging
 from nodes.state_manager import state_manager
+from nodes.execution_manager import execution_manager
+from nodes.ui_queue import ui_queue
+from nodes.preview import previews
+from nodes.culling import viewport_culler
+from nodes.registry import created_nodes
+from nodes.tabs.other_tab import refresh_profiler_table, refresh_execution_stats
 import time  # ← добавлено!
 
 
 if __name__ == "__main__":
+    configure_logging("INFO")
     dpg.create_context()
 
     # Загрузка основного шрифта и шрифта для эмодзи...
     try:
         with dpg.font_registry():
-            font_path = "I:\My\LLM\RAG\dearpygui\Proj3\NotoSans-Regular.ttf"
+            font_path = r"I:\My\LLM\RAG\dearpygui\Proj3\NotoSans-Regular.ttf"
             with dpg.font(font_path, 18) as font1:
                 dpg.add_font_range_hint(dpg.mvFontRangeHint_Cyrillic)
                 
@@ -54,6 +62,8 @@ if __name__ == "__main__":
     # Main render loop with improved performance
     frame_count = 0
     last_time = time.time()
+    last_profiler_refresh = 0
+    last_log_refresh = 0
     
     while dpg.is_dearpygui_running():
         current_time = time.time()
@@ -65,8 +75,26 @@ if __name__ == "__main__":
                 state_manager.save_state(f"{state_manager.save_dir}/autosave_{int(current_time)}.json")
                 state_manager.last_autosave = current_time
         
+        # Живая таблица профилировщика и счётчики перегрузки (не чаще двух раз в секунду)
+        if current_time - last_profiler_refresh > 0.5:
+            if execution_manager.profiler.enabled:
+                refresh_profiler_table()
+            refresh_execution_stats()
+            last_profiler_refresh = current_time
+
+        # Лог статуса (не чаще четырёх раз в секунду)
+        if current_time - last_log_refresh > 0.25:
+            refresh_log_view()
+            last_log_refresh = current_time
+
         # Optimize rendering by limiting frame rate to 60 FPS
         if current_time - last_time >= 1/60:
+            # Ноды вне экрана сворачиваются до заголовка, вернувшиеся — разворачиваются
+            viewport_culler.update(created_nodes)
+            # Обновления UI из рабочих потоков — один раз за кадр
+            ui_queue.flush()
+            # Превью изменившихся выходов — только для видимых виджетов
+            previews.render()
             dpg.render_dearpygui_frame()
             last_time = current_time
             frame_count += 1
@@ -0,0 +1,98 @@
+# nodes/async_executor.py
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+log = logging.getLogger(__name__)
+
+
+class AsyncExecutor:
+    """
+    Выполняет корутины нод (async def process(), запросы к Qdrant и т.п.) на отдельном
+    потоке с event loop. Одновременно выполняется не больше max_concurrency корутин,
+    остальные ждут на семафоре, не занимая потоков.
+    Блокирующие вызовы внутри корутин (await asyncio.to_thread(...)) уходят в общий
+    пул из blocking_workers потоков, а не в отдельный поток на каждый запрос.
+    """
+
+    def __init__(self, max_concurrency=32, blocking_workers=8):
+        self.max_concurrency = max_concurrency
+        self.blocking_workers = blocking_workers
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._semaphore = None
+
+    @property
+    def running(self):
+        return self._loop is not None
+
+    def _ensure_loop(self):
+        """Запускает поток с event loop при первом обращении."""
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+                thread = threading.Thread(target=self._run_loop, args=(loop, ready),
+                                          name="node-async", daemon=True)
+                thread.start()
+                ready.wait()
+                self._loop, self._thread = loop, thread
+                log.debug("Async loop started (max concurrency %d)", self.max_concurrency)
+            return self._loop
+
+    def _run_loop(self, loop, ready):
+        asyncio.set_event_loop(loop)
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=self.blocking_workers,
+                                                     thread_name_prefix="node-io"))
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        loop.call_soon(ready.set)
+        try:
+            loop.run_forever()
+        finally:
+            # Отменяем незавершённые корутины, чтобы их Future получили CancelledError
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            if pending:
+                loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_default_executor())
+            loop.close()
+
+    async def _limited(self, coroutine_function, args):
+        async with self._semaphore:
+            return await coroutine_function(*args)
+
+    def submit(self, coroutine_function, *args):
+        """
+        Ставит coroutine_function(*args) в очередь на event loop и сразу возвращает
+        concurrent.futures.Future с результатом.
+        """
+        loop = self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(self._limited(coroutine_function, args), loop)
+
+    def set_max_concurrency(self, max_concurrency):
+        """Меняет лимит одновременно выполняемых корутин (уже запущенные дорабатывают)."""
+        self.max_concurrency = max(1, int(max_concurrency))
+        with self._lock:
+            loop = self._loop
+        if loop is not None:
+            loop.call_soon_threadsafe(self._replace_semaphore, self.max_concurrency)
+        log.info("Async concurrency set to %d", self.max_concurrency)
+
+    def _replace_semaphore(self, max_concurrency):
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    def shutdown(self):
+        """Останавливает event loop; незавершённые корутины отменяются."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not threading.current_thread():
+            thread.join(timeout=2)
+        log.debug("Async loop stopped")
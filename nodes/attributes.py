@@ -0,0 +1,79 @@
+# nodes/attributes.py
+# Реестр атрибутов нод Dear PyGui: attr_id -> (node_id, "input"/"output", key).
+# Кроме прямого словаря держит обратный индекс (node_id, тип, key) -> attr_id и список
+# атрибутов каждой ноды, поэтому поиск атрибута связи и очистка нод не перебирают
+# все атрибуты редактора.
+
+from collections.abc import MutableMapping
+
+
+class AttributeRegistry(MutableMapping):
+    """
+    Ведёт себя как словарь {attr_id: (node_id, attr_type, key)} (BaseNode.attr_id_to_key_map),
+    индексы обновляются при каждой записи и удалении.
+    """
+
+    def __init__(self):
+        self._forward = {}   # {attr_id: (node_id, attr_type, key)}
+        self._reverse = {}   # {(node_id, attr_type, key): attr_id}
+        self._by_node = {}   # {node_id: {attr_id: None}} — упорядоченное множество
+
+    # --- Интерфейс словаря ---
+    def __getitem__(self, attr_id):
+        return self._forward[attr_id]
+
+    def __setitem__(self, attr_id, info):
+        if attr_id in self._forward:
+            del self[attr_id]
+        node_id, attr_type, key = info
+        self._forward[attr_id] = (node_id, attr_type, key)
+        self._reverse[(node_id, attr_type, key)] = attr_id
+        self._by_node.setdefault(node_id, {})[attr_id] = None
+
+    def __delitem__(self, attr_id):
+        info = self._forward.pop(attr_id)
+        if self._reverse.get(info) == attr_id:
+            del self._reverse[info]
+        node_attrs = self._by_node.get(info[0])
+        if node_attrs is not None:
+            node_attrs.pop(attr_id, None)
+            if not node_attrs:
+                del self._by_node[info[0]]
+
+    def __iter__(self):
+        return iter(self._forward)
+
+    def __len__(self):
+        return len(self._forward)
+
+    def __repr__(self):
+        return f"AttributeRegistry({self._forward!r})"
+
+    # --- Индексы ---
+    def register(self, attr_id, node_id, attr_type, key):
+        self[attr_id] = (node_id, attr_type, key)
+
+    def find(self, node_id, attr_type, key):
+        """attr_id атрибута ноды по типу ("input"/"output") и ключу или None."""
+        return self._reverse.get((node_id, attr_type, key))
+
+    def attributes_of(self, node_id):
+        """Список attr_id атрибутов ноды в порядке регистрации."""
+        return list(self._by_node.get(node_id, ()))
+
+    def remove_node(self, node_id):
+        """Удаляет все атрибуты ноды. Возвращает их attr_id."""
+        attr_ids = list(self._by_node.pop(node_id, ()))
+        for attr_id in attr_ids:
+            info = self._forward.pop(attr_id, None)
+            if info is not None and self._reverse.get(info) == attr_id:
+                del self._reverse[info]
+        return attr_ids
+
+    def clear(self):
+        self._forward.clear()
+        self._reverse.clear()
+        self._by_node.clear()
+
+
+attribute_registry = AttributeRegistry()
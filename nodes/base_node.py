@@ -1,12 +1,62 @@
 # nodes/base_node.py
 
+import asyncio
+import logging
 import dearpygui.dearpygui as dpg
 from abc import ABC, abstractmethod
+from .attributes import attribute_registry
+from .memo import stable_hash
+from .preview import is_array, previews
+from .streams import TokenStream, resolve_streams
+from .ui_queue import ui_queue
+
+log = logging.getLogger(__name__)
+
+
+def values_differ(old, new):
+    """Проверяет, изменилось ли значение (безопасно для объектов без однозначного ==)."""
+    if old is new:
+        return False
+    if is_array(old) and is_array(new):
+        # Массивы сравниваются целиком: форма, тип и элементы
+        try:
+            return old.shape != new.shape or old.dtype != new.dtype or not bool((old == new).all())
+        except Exception:
+            return True
+    try:
+        return bool(old != new)
+    except Exception:
+        # Например, массивы: сравнение поэлементное и bool() неоднозначен
+        return True
+
 
 class BaseNode(ABC):
     # Добавим классовые атрибуты для хранения соответствия ID <-> Key
     # Это будет использоваться ExecutionManager
-    attr_id_to_key_map = {} # {attr_id: (node_id, "input"/"output", key)}
+    # {attr_id: (node_id, "input"/"output", key)} с обратным индексом и атрибутами по нодам
+    attr_id_to_key_map = attribute_registry
+
+    # Чистая функция вычисления без UI: (**inputs) -> {output_key: value}.
+    # Должна быть функцией уровня модуля без Dear PyGui, чтобы выполняться в ProcessPoolExecutor
+    compute_function = None
+    # Ключи входов, передаваемых в compute_function
+    compute_inputs = ()
+
+    # Чистая нода: выходы зависят только от входов и memo_params(), без побочных
+    # эффектов. Результаты таких нод ExecutionManager кэширует в MemoCache
+    pure = False
+
+    # Шаблон выражения для слияния цепочек чистых нод (graph_compiler), например
+    # "{a} + {b}": ключи — compute_inputs, результат пишется в выход fuse_output
+    fuse_expression = None
+    fuse_output = "result"
+
+    # Предел длины текста превью выхода в символах (None — без ограничения)
+    preview_chars = 2000
+
+    # Нода читает TokenStream на входах по мере поступления фрагментов (см. streams.py);
+    # иначе вход получает полный текст, когда поток закрыт
+    accepts_streams = False
 
     
     def __init__(self, label: str, parent="node_editor", pos=None):
@@ -19,6 +69,14 @@ class BaseNode(ABC):
         # --- НОВОЕ: внутреннее состояние для данных ---
         self.state = {"inputs": {}, "outputs": {}}
         # ---
+        # Флаг "грязной" ноды: ExecutionManager вызывает process() только для таких нод
+        self.dirty = True
+        # Наблюдатель за изменениями (ExecutionManager, в который зарегистрирована нода)
+        self.observer = None
+        # Headless-режим: нода выполняется без Dear PyGui, create() не вызывается,
+        # значения ручных входов хранятся в widget_values вместо виджетов
+        self.headless = False
+        self.widget_values = {}
 
 
     
@@ -27,7 +85,7 @@ class BaseNode(ABC):
         
         # Убедитесь, что родитель существует перед созданием узла
         if not dpg.does_item_exist(self.parent):
-            print(f"Parent {self.parent} does not exist!")
+            log.error("Parent %s does not exist!", self.parent)
             return None
 
         try:
@@ -36,17 +94,19 @@ class BaseNode(ABC):
                 self._create_inputs()
                 self._create_outputs()
 
+            # Любое изменение входа в UI помечает ноду для пересчёта
+            for widget_id in self.inputs.values():
+                dpg.configure_item(widget_id, callback=self._on_ui_input_changed)
+
 
             # === ОГРАНИЧЕНИЕ ШИРИНЫ ПОСЛЕ СОЗДАНИЯ ===
             if hasattr(self, 'max_node_width'):
                 dpg.set_item_width(self.node_id, self.max_node_width)
-                print(f"✅ Установлена ширина ноды {self.label}: {self.max_node_width}px")
+                log.debug("Node %s width set to %spx", self.label, self.max_node_width)
                     # Если есть дополнительные элементы - добавляем их здесь
 
         except Exception as e:
-            print(f"Error creating node: {e}")
-            import traceback
-            traceback.print_exc()
+            log.exception("Error creating node: %s", e)
             return None
 
         return self.node_id
@@ -72,33 +132,135 @@ class BaseNode(ABC):
         # 1. Сначала пробуем внутреннее состояние (для передачи данных от других нод)
         if key in self.state["inputs"]:
             val = self.state["inputs"][key]
-            print(f"BaseNode: Got input '{key}' from internal state: {val}")
+            log.debug("Got input '%s' from internal state: %r", key, val)
             return val
         # 2. Если нет, пробуем получить из Dear PyGui (для ручного ввода)
-        if key in self.inputs:
+        if key in self.inputs and not self.headless:
             val = dpg.get_value(self.inputs[key])
-            print(f"BaseNode: Got input '{key}' from Dear PyGui UI: {val}")
+            log.debug("Got input '%s' from Dear PyGui UI: %r", key, val)
+            return val
+        # 3. Без UI — сохранённое значение ручного ввода
+        if key in self.widget_values:
+            val = self.widget_values[key]
+            log.debug("Got input '%s' from widget values: %r", key, val)
             return val
-        print(f"BaseNode: Input '{key}' not found in state or UI.")
+        log.debug("Input '%s' not found in state or UI.", key)
         return None
 
     def set_output_value(self, key, value):
-        """Сохраняет значение во внутреннее состояние и обновляет UI."""
+        """
+        Сохраняет значение во внутреннее состояние, передаёт его по связям и отмечает
+        превью виджета для отрисовки (сам текст строится в UI-потоке, см. preview.py).
+        """
+        outputs = self.state["outputs"]
+        changed = key not in outputs or values_differ(outputs[key], value)
         # Сохраняем внутрь
-        self.state["outputs"][key] = value
-        # Обновляем UI, если такой output существует
-        if key in self.outputs:
-            dpg.set_value(self.outputs[key], str(value))
+        outputs[key] = value
+        # Изменившееся значение сразу уходит получателям по связям этого выхода
+        if changed and self.observer is not None:
+            self.observer.on_output_changed(self, key, value)
+        # Обновляем UI, если такой output существует и значение изменилось
+        if changed and key in self.outputs and not self.headless:
+            previews.mark(self, key)
+
+    def open_stream(self, key):
+        """
+        Публикует в выход key новый TokenStream и возвращает его. Писать в поток
+        можно из любого потока; получатели узнают о каждом фрагменте.
+        """
+        stream = TokenStream()
+        stream.add_listener(lambda updated: self._on_stream_updated(key, updated))
+        self.set_output_value(key, stream)
+        return stream
+
+    def _on_stream_updated(self, key, stream):
+        if self.observer is not None:
+            self.observer.on_stream_updated(self, key, stream)
+
+    def set_widget_value(self, key, value):
+        """Задаёт значение ручного входа: в виджет, если он есть, иначе в widget_values."""
+        if key in self.inputs and not self.headless:
+            dpg.set_value(self.inputs[key], value)
+        else:
+            self.widget_values[key] = value
+        self.mark_dirty("input")
+
+    # --- Обращения к UI (в headless-режиме ничего не делают) ---
+    # Из рабочих потоков обновления идут через ui_queue и применяются раз в кадр
+    def _ui_set(self, item, value):
+        if not self.headless and item is not None:
+            ui_queue.set_value(item, value)
+
+    def _ui_configure(self, item, **kwargs):
+        if not self.headless and item is not None:
+            ui_queue.configure_item(item, **kwargs)
 
     def set_input_value_from_link(self, key, value):
         """Устанавливает входное значение из другой ноды (через связь)."""
+        # Помечаем ноду грязной только если значение действительно изменилось
+        if key not in self.state["inputs"] or values_differ(self.state["inputs"][key], value):
+            self.mark_dirty("link")
         # Сохраняем значение во внутреннее состояние
         self.state["inputs"][key] = value
         # --- НЕ ОБНОВЛЯЕМ UI ВХОДА ---
         # Это может привести к рекурсии или конфликту с пользовательским вводом
         # if key in self.inputs:
         #     dpg.set_value(self.inputs[key], str(value)) # <- УБРАНО
-        print(f"BaseNode: Set input '{key}' from link to value {value}")
+        log.debug("Set input '%s' from link to value %r", key, value)
+
+    # --- Memo-кэш чистых нод ---
+    def memo_params(self):
+        """Параметры ноды, влияющие на результат помимо входов (для ключа кэша)."""
+        return {}
+
+    def memo_key(self, inputs=None):
+        """Стабильный хеш класса, разрешённых входов (inputs или resolved_inputs()) и параметров ноды."""
+        cls = type(self)
+        if inputs is None:
+            inputs = self.resolved_inputs()
+        return stable_hash((cls.__module__, cls.__qualname__, inputs, self.memo_params()))
+
+    # --- Асинхронные операции ---
+    def run_async(self, coroutine_function, *args):
+        """
+        Запускает coroutine_function(*args) на AsyncExecutor менеджера, не блокируя
+        вызывающий поток (UI, поток выполнения). Возвращает concurrent.futures.Future.
+        Без менеджера корутина выполняется синхронно и возвращается её результат.
+        """
+        executor = getattr(self.observer, "async_executor", None)
+        if executor is None:
+            return asyncio.run(coroutine_function(*args))
+        return executor.submit(coroutine_function, *args)
+
+    # --- Вычисление вне потока выполнения ---
+    def resolved_inputs(self):
+        """Текущие значения всех входов ноды (по связям, из виджетов или widget_values)."""
+        keys = self.compute_inputs or sorted(set(self.inputs) | set(self.state["inputs"]) | set(self.widget_values))
+        return {key: self.get_input_value(key) for key in keys}
+
+    def get_compute_inputs(self):
+        """Собирает входы для compute_function."""
+        return {key: self.get_input_value(key) for key in self.compute_inputs}
+
+    def apply_compute_result(self, result):
+        """Записывает результат compute_function в выходы ноды."""
+        for key, value in result.items():
+            self.set_output_value(key, value)
+
+    # --- Отслеживание изменений ---
+    def mark_dirty(self, reason="input"):
+        """
+        Помечает ноду для пересчёта и сообщает об этом наблюдателю.
+        reason: "input" (UI), "link" (значение по связи), "llm" (генерация завершена),
+        "qdrant" (результат операции с базой), "stream" (новый фрагмент входного потока)
+        """
+        self.dirty = True
+        if self.observer is not None:
+            self.observer.on_node_dirty(self, reason)
+
+    def _on_ui_input_changed(self, sender, app_data, user_data=None):
+        """Callback виджетов входа: пользователь изменил значение."""
+        self.mark_dirty("input")
 
     # --- Метод для регистрации атрибутов ---
     def _register_attr(self, attr_id, attr_type, key):
@@ -108,8 +270,8 @@ class BaseNode(ABC):
         attr_type: "input" или "output"
         key: строковый ключ ("a", "result", etc.)
         """
-        BaseNode.attr_id_to_key_map[attr_id] = (self.node_id, attr_type, key)
-        print(f"BaseNode: Registered attr {attr_id} -> ({self.node_id}, {attr_type}, {key})")
+        BaseNode.attr_id_to_key_map.register(attr_id, self.node_id, attr_type, key)
+        log.debug("Registered attr %s -> (%s, %s, %s)", attr_id, self.node_id, attr_type, key)
 
 
     #-------------------------------------Сохранение и загрузка-------------------------------------
@@ -120,25 +282,31 @@ class BaseNode(ABC):
             "pos": self.pos,
             "inputs": {},
             "outputs": {},
-            "internal_state": self.state  # Сохраняем внутреннее состояние
+            # Сохраняем внутреннее состояние (потоки — их текстом)
+            "internal_state": {section: resolve_streams(values) for section, values in self.state.items()}
         }
         
         # Сохраняем значения входов
+        state["inputs"].update(self.widget_values)
         for key, widget_id in self.inputs.items():
+            if self.headless:
+                break
             try:
                 value = dpg.get_value(widget_id)
                 state["inputs"][key] = value
             except Exception as e:
-                print(f"Warning: Could not get value for input {key}: {e}")
+                log.warning("Could not get value for input %s: %s", key, e)
                 state["inputs"][key] = None
         
         # Сохраняем значения выходов
         for key, widget_id in self.outputs.items():
+            if self.headless:
+                break
             try:
                 value = dpg.get_value(widget_id)
                 state["outputs"][key] = value
             except Exception as e:
-                print(f"Warning: Could not get value for output {key}: {e}")
+                log.warning("Could not get value for output %s: %s", key, e)
                 state["outputs"][key] = None
                 
         return state
@@ -150,19 +318,23 @@ class BaseNode(ABC):
         
         # Восстанавливаем значения входов
         for key, value in data.get("inputs", {}).items():
-            if hasattr(self, 'inputs') and key in self.inputs:
+            if self.headless:
+                self.widget_values[key] = value
+            elif hasattr(self, 'inputs') and key in self.inputs:
                 try:
                     dpg.set_value(self.inputs[key], value)
                 except Exception as e:
-                    print(f"Warning: Could not set value for input {key}: {e}")
+                    log.warning("Could not set value for input %s: %s", key, e)
         
         # Восстанавливаем значения выходов
         for key, value in data.get("outputs", {}).items():
+            if self.headless:
+                break
             if hasattr(self, 'outputs') and key in self.outputs:
                 try:
                     dpg.set_value(self.outputs[key], value)
                 except Exception as e:
-                    print(f"Warning: Could not set value for output {key}: {e}")
+                    log.warning("Could not set value for output %s: %s", key, e)
         
         # Восстанавливаем внутреннее состояние
         internal_state = data.get("internal_state", {})
@@ -172,20 +344,30 @@ class BaseNode(ABC):
 
 
     def add_attribute(self, label, direction, default_value=0.0):
+        """
+        Добавляет в уже созданную ноду атрибут с ключом label.
+        direction: dpg.mvNode_Attr_Input или dpg.mvNode_Attr_Output
+        """
         # 1. Создаем атрибут в DPG
-        attr_id = dpg.add_node_attribute(label=label, default_value=default_value, direction=direction)
-        
+        attr_id = dpg.add_node_attribute(label=label, attribute_type=direction, parent=self.node_id)
+        attr_type = "output" if direction == dpg.mvNode_Attr_Output else "input"
+        if attr_type == "input":
+            self.inputs[label] = dpg.add_input_float(default_value=default_value, width=100, parent=attr_id,
+                                                     callback=self._on_ui_input_changed)
+        else:
+            self.outputs[label] = dpg.add_text(str(default_value), parent=attr_id)
+
         # 2. СРАЗУ же записываем в маппинг
-        # self.tag - это DPG ID ноды (int)
-        attr_type = "output" if direction == dpg.mvAttr_Out else "input"
-        BaseNode.attr_id_to_key_map[attr_id] = (self.tag, attr_type, label)
-        
+        self._register_attr(attr_id, attr_type, label)
         return attr_id
 
     def __del__(self):
-        # Желательно очищать маппинг при удалении ноды, 
-        # хотя load_state теперь делает clear() глобально.
-        # Но для безопасности при удалении отдельных нод в редакторе:
-        keys_to_remove = [k for k, v in BaseNode.attr_id_to_key_map.items() if v[0] == self.tag]
-        for k in keys_to_remove:
-            del BaseNode.attr_id_to_key_map[k]
\ No newline at end of file
+        # Атрибуты ноды, удалённой в редакторе, больше не нужны в маппинге
+        # (load_state очищает его целиком)
+        if self.node_id is None or self.headless:
+            return
+        try:
+            BaseNode.attr_id_to_key_map.remove_node(self.node_id)
+        except Exception:
+            # При завершении интерпретатора модули могут быть уже выгружены
+            pass
\ No newline at end of file
@@ -0,0 +1,147 @@
+# nodes/culling.py
+# Отсечение нод за пределами видимой области редактора.
+#
+# В больших графах (сотни и тысячи нод) каждая нода держит живые виджеты: многострочные
+# поля, слайдеры, индикаторы. ViewportCuller раз в interval секунд сравнивает экранный
+# прямоугольник каждой ноды с областью node_editor (плюс запас margin) и у нод вне экрана
+# скрывает виджеты атрибутов: остаются заголовок и пины, связи рисуются как обычно.
+# Обновления скрытых виджетов из рабочих потоков задерживаются в ui_queue (hold),
+# превью не форматируются; когда нода возвращается в область видимости, виджеты
+# показываются снова и накопленные значения применяются в том же кадре.
+#
+# Dear PyGui не даёт масштабировать редактор нод, поэтому «дальних» нод нет:
+# уровень детализации определяется только попаданием в видимую область.
+
+import logging
+import time
+
+import dearpygui.dearpygui as dpg
+
+from .ui_queue import ui_queue
+
+log = logging.getLogger(__name__)
+
+
+class ViewportCuller:
+    def __init__(self, editor="node_editor", margin=200, interval=0.1, min_nodes=150):
+        self.editor = editor
+        self.enabled = True
+        self.margin = margin          # запас вокруг видимой области, px (против мерцания при прокрутке)
+        self.interval = interval      # как часто проверять положение нод, с
+        self.min_nodes = min_nodes    # в графах меньше этого размера ноды не сворачиваются
+        self._culled = {}             # {node_id: ([все виджеты], [скрытые culler'ом])}
+        self._last_update = 0.0
+        self.collapsed = 0            # всего сворачиваний
+        self.restored = 0             # всего разворачиваний
+
+    def is_culled(self, node_id):
+        return node_id in self._culled
+
+    @property
+    def culled_count(self):
+        return len(self._culled)
+
+    def set_enabled(self, enabled):
+        self.enabled = bool(enabled)
+        if not self.enabled:
+            self.restore_all()
+
+    def update(self, node_instances, force=False):
+        """
+        Сворачивает ноды вне экрана и разворачивает вернувшиеся (только из UI-потока,
+        перед ui_queue.flush()). node_instances — {node_id: instance}.
+        Возвращает число нод, у которых изменилось состояние.
+        """
+        now = time.perf_counter()
+        if not force and now - self._last_update < self.interval:
+            return 0
+        self._last_update = now
+
+        if not self.enabled or len(node_instances) < self.min_nodes:
+            return self.restore_all()
+        if not dpg.does_item_exist(self.editor):
+            return 0
+
+        editor_x, editor_y = dpg.get_item_rect_min(self.editor)
+        editor_width, editor_height = dpg.get_item_rect_size(self.editor)
+        if editor_width <= 0 or editor_height <= 0:
+            # Редактор ещё не отрисован или вкладка скрыта — оставляем как есть
+            return 0
+        left, top = editor_x - self.margin, editor_y - self.margin
+        right, bottom = editor_x + editor_width + self.margin, editor_y + editor_height + self.margin
+
+        changed = 0
+        for node_id in list(node_instances):
+            if not dpg.does_item_exist(node_id):
+                continue
+            state = dpg.get_item_state(node_id)
+            rect_min = state.get("rect_min")
+            rect_size = state.get("rect_size")
+            if not rect_min or not rect_size or rect_size[0] <= 0:
+                # Нода ещё ни разу не отрисована: её положение неизвестно
+                visible = True
+            else:
+                x, y = rect_min
+                visible = (x + rect_size[0] >= left and x <= right
+                           and y + rect_size[1] >= top and y <= bottom)
+            if visible and node_id in self._culled:
+                self._restore(node_id)
+                changed += 1
+            elif not visible and node_id not in self._culled:
+                self._collapse(node_id)
+                changed += 1
+
+        if changed:
+            log.debug("Viewport culling: %d changed, %d of %d nodes collapsed",
+                      changed, len(self._culled), len(node_instances))
+        return changed
+
+    def _collapse(self, node_id):
+        """
+        Скрывает видимые виджеты атрибутов ноды и задерживает обновления всех её виджетов,
+        в том числе уже скрытых (configure_item(show=True) из рабочего потока не должен
+        показать их в свёрнутой ноде).
+        """
+        items = []
+        hidden = []
+        for attr_id in dpg.get_item_children(node_id, 1) or ():
+            for item in dpg.get_item_children(attr_id, 1) or ():
+                items.append(item)
+                if dpg.is_item_shown(item):
+                    dpg.configure_item(item, show=False)
+                    hidden.append(item)
+        self._culled[node_id] = (items, hidden)
+        ui_queue.hold(items)
+        self.collapsed += 1
+
+    def _restore(self, node_id):
+        """Показывает виджеты, скрытые при сворачивании, и применяет задержанные обновления."""
+        items, hidden = self._culled.pop(node_id, ((), ()))
+        for item in hidden:
+            if dpg.does_item_exist(item):
+                dpg.configure_item(item, show=True)
+        ui_queue.release(items)
+        self.restored += 1
+
+    def restore_all(self):
+        """Разворачивает все свёрнутые ноды. Возвращает их число."""
+        node_ids = list(self._culled)
+        for node_id in node_ids:
+            self._restore(node_id)
+        return len(node_ids)
+
+    def forget(self, node_id):
+        """Нода удалена: снимаем задержку с её виджетов, не трогая их."""
+        items, _ = self._culled.pop(node_id, ((), ()))
+        ui_queue.release(items)
+
+    def reset(self):
+        """Все ноды редактора удалены (новый файл, загрузка состояния)."""
+        for node_id in list(self._culled):
+            self.forget(node_id)
+
+    def stats(self):
+        return {"culled": len(self._culled), "collapsed": self.collapsed, "restored": self.restored}
+
+
+viewport_culler = ViewportCuller()
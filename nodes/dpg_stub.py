@@ -0,0 +1,41 @@
+# nodes/dpg_stub.py
+# Заглушка Dear PyGui для запуска без UI (headless, воспроизведение трасс, бенчмарки):
+# модули нод импортируют dearpygui на уровне модуля, но в headless-режиме его не вызывают.
+# Любая функция — no-op, любая константа (mvNode_Attr_Input и т.п.) — целое число.
+
+import sys
+import types
+
+
+class _StubModule(types.ModuleType):
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        if name.startswith("mv"):
+            value = 0
+        else:
+            def value(*args, **kwargs):
+                return None
+        setattr(self, name, value)
+        return value
+
+
+def install():
+    """Подменяет dearpygui в sys.modules (до импорта модулей нод)."""
+    package = types.ModuleType("dearpygui")
+    package.__path__ = []
+    module = _StubModule("dearpygui.dearpygui")
+    package.dearpygui = module
+    sys.modules["dearpygui"] = package
+    sys.modules["dearpygui.dearpygui"] = module
+    return module
+
+
+def ensure_dearpygui():
+    """Ставит заглушку, если Dear PyGui не установлен. True — используется настоящий."""
+    try:
+        import dearpygui.dearpygui  # noqa: F401
+        return True
+    except ImportError:
+        install()
+        return False
@@ -1,11 +1,23 @@
 # nodes/execution_manager.py
 
-import dearpygui.dearpygui as dpg
+import logging
+import os
+import queue
 import threading
 import time
-from collections import defaultdict, deque
+from collections import defaultdict
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
 # Импортируем BaseNode, чтобы получить доступ к attr_id_to_key_map
 from .base_node import BaseNode
+from .async_executor import AsyncExecutor
+from .execution_plan import ExecutionPlan, compile_plan
+from .memo import MemoCache
+from .profiler import NodeProfiler
+from .streams import link_value
+from .trace import TraceRecorder
+
+log = logging.getLogger(__name__)
 
 class ExecutionManager:
     def __init__(self):
@@ -17,30 +29,214 @@ class ExecutionManager:
         # --- НОВОЕ: структуры для передачи данных ---
         # {target_attr_id: (source_node_id, source_output_key)}
         self.link_data_map = {}
+        # [(source_node_id, source_key, target_node_id, target_key)] — вход для компиляции плана
+        self.logical_links = []
         # ---
 
+        # Скомпилированный план выполнения; пересобирается только при изменении
+        # топологии и подменяется одним присваиванием (атомарно для потока выполнения)
+        self.plan = ExecutionPlan.empty()
+        self._plan_lock = threading.Lock()
+
         self.execution_thread = None
         self.running = False
         self.execution_speed = 1.0
 
+        # Параллельное выполнение независимых веток (по умолчанию выключено)
+        self.parallel_execution = False
+        self.max_workers = 4
+        self._thread_pool = None
+        # Отдельный пул для нод под node_timeout (_run_guarded)
+        self._guard_pool = None
+
+        # Выполнение compute_function нод в отдельных процессах (по умолчанию выключено)
+        self.process_pool_enabled = False
+        self.process_workers = os.cpu_count() or 1
+        self._process_pool = None
+
+        # Событийный режим: поток выполнения спит, пока не придёт событие
+        # (правка входа, изменение связей, завершение генерации LLM, результат Qdrant)
+        self.event_driven = False
+        self._events = queue.Queue()
+
+        # Ограничения времени (None — выключено):
+        # node_timeout — сколько такт ждёт одну ноду; не успевшая нода дорабатывает
+        #   в фоне, а такт идёт дальше без неё
+        # tick_budget — бюджет такта; оставшиеся грязные ноды переносятся на следующий такт
+        self.node_timeout = None
+        self.tick_budget = None
+        self._late = {}  # {node_id: Future} — ноды, превысившие node_timeout
+        self.tick_stats = {"ticks": 0, "overrun_ticks": 0, "skipped_ticks": 0,
+                           "timed_out_nodes": 0, "deferred_nodes": 0}
+
+        # Слияние цепочек арифметических нод в одну функцию (по умолчанию выключено)
+        self.fusion_enabled = False
+
+        # Кэш результатов чистых нод (pure = True)
+        self.memo = MemoCache()
+
+        # Ноды с async def process() выполняются на отдельном event loop;
+        # {node_id: Future} — ещё не завершившиеся корутины
+        self.async_executor = AsyncExecutor()
+        self._async_in_flight = {}
+
+        # Профилировщик нод; пока выключен, замеры не выполняются
+        self.profiler = NodeProfiler()
+
+        # Запись трассы выполнения (None — не пишется), см. trace.py
+        self.recorder = None
+
+        # Пакетное изменение графа (batch()): пересборки откладываются до конца пакета.
+        # _batch_pending — что пересобрать: "links" (связи по атрибутам),
+        # "logical_links" (связи по ключам), "plan", "dirty"
+        self._batch_depth = 0
+        self._batch_pending = set()
+
+        # Такт цикла выполнения, run_once() и evaluate() не идут одновременно
+        self._tick_lock = threading.Lock()
+
+        # Отмечает потоки, выполняющие process() внутри такта: выходы, изменённые
+        # вне такта (кнопки, фоновые потоки), дополнительно будят планировщик
+        self._in_node = threading.local()
+
     def register_node(self, node_instance, node_id):
         self.node_instances[node_id] = node_instance
-        print(f"ExecutionManager: Registered node {node_instance.label} with ID {node_id}")
+        node_instance.observer = self
+        log.info("Registered node %s with ID %s", node_instance.label, node_id)
+        self._rebuild_plan()
+        self.post_event("topology", node_id)
 
     def unregister_node(self, node_id):
         if node_id in self.node_instances:
-            del self.node_instances[node_id]
-            print(f"ExecutionManager: Unregistered node ID {node_id}")
+            node_instance = self.node_instances.pop(node_id)
+            if node_instance.observer is self:
+                node_instance.observer = None
+            log.info("Unregistered node ID %s", node_id)
+            self._rebuild_plan()
 
     def update_links(self, new_links):
-        print(f"ExecutionManager: Updating links. Old count: {len(self.attribute_links)}, New count: {len(new_links)}")
+        log.info("Updating links. Old count: %d, New count: %d", len(self.attribute_links), len(new_links))
         self.attribute_links = list(new_links)
+        if self._batch_depth:
+            self._batch_pending.discard("logical_links")
+            self._batch_pending.update(("links", "plan", "dirty"))
+            return
         self._rebuild_dependency_structures()
+        self._rebuild_plan()
+        # Топология изменилась — пересчитываем весь граф один раз
+        self.mark_all_dirty()
+
+    def set_logical_links(self, links):
+        """
+        Задаёт связи по логическим ключам, без ID атрибутов Dear PyGui (headless-режим).
+        links: [(source_node_id, source_key, target_node_id, target_key)]
+        """
+        self.attribute_links = []
+        self.link_data_map.clear()
+        self.logical_links = list(links)
+        if self._batch_depth:
+            self._batch_pending.discard("links")
+            self._batch_pending.update(("logical_links", "plan", "dirty"))
+            return
+        self._rebuild_logical_dependencies()
+        self._rebuild_plan()
+        self.mark_all_dirty()
+
+    def mark_all_dirty(self):
+        """Помечает все ноды для пересчёта на следующем такте."""
+        if self._batch_depth:
+            self._batch_pending.add("dirty")
+            return
+        for node_instance in self.node_instances.values():
+            node_instance.dirty = True
+        self.post_event("topology")
+
+    # --- События ---
+    def post_event(self, kind, node_id=None):
+        """Ставит событие в очередь планировщика (только в событийном режиме)."""
+        if self.event_driven:
+            self._events.put((kind, node_id))
+
+    def on_output_changed(self, node_instance, key, value):
+        """
+        Вызывается нодой из set_output_value(), когда значение выхода изменилось.
+        Передаёт его только по связям этого выхода; получатели, чьи входы изменились,
+        помечаются грязными в set_input_value_from_link.
+        """
+        if value is None:
+            return
+        targets = self.plan.fanout.get(node_instance.node_id, {}).get(key)
+        if not targets:
+            return
+        profiling = self.profiler.enabled
+        if profiling:
+            started = time.perf_counter()
+        debug = log.isEnabledFor(logging.DEBUG)
+        for target_node_id, target_key in targets:
+            target_node_instance = self.node_instances.get(target_node_id)
+            if target_node_instance is None:
+                log.warning("Target node instance for %s not found.", target_node_id)
+                continue
+            target_value = link_value(value, target_node_instance)
+            if target_value is None:
+                # Незакрытый поток для ноды без accepts_streams — текст придёт при закрытии
+                continue
+            target_node_instance.set_input_value_from_link(target_key, target_value)
+            if debug:
+                log.debug("Propagated %r from %s.%s to %s.%s", value, node_instance.label,
+                          key, target_node_instance.label, target_key)
+        if profiling:
+            self.profiler.record_propagation(node_instance.node_id, node_instance.label,
+                                             time.perf_counter() - started)
+        if not getattr(self._in_node, "active", False):
+            # Изменение пришло не из process() — будим планировщик
+            self.post_event("output", node_instance.node_id)
+
+    def on_stream_updated(self, node_instance, key, stream):
+        """
+        Вызывается из потока писателя TokenStream после нового фрагмента или закрытия.
+        Получатели с accepts_streams пересчитываются на каждом фрагменте, остальные
+        получают полный текст при закрытии.
+        """
+        targets = self.plan.fanout.get(node_instance.node_id, {}).get(key)
+        if not targets:
+            return
+        for target_node_id, target_key in targets:
+            target_node_instance = self.node_instances.get(target_node_id)
+            if target_node_instance is None:
+                continue
+            if target_node_instance.accepts_streams:
+                target_node_instance.mark_dirty("stream")
+            elif stream.closed:
+                target_node_instance.set_input_value_from_link(target_key, stream.text)
+        self.post_event("stream", node_instance.node_id)
+
+    def on_node_dirty(self, node_instance, reason):
+        """Вызывается нодой из mark_dirty()."""
+        # Значения по связям передаются внутри такта, поэтому будить планировщик не нужно
+        if reason != "link":
+            self.post_event(reason, node_instance.node_id)
+
+    def _wait_for_events(self):
+        """Блокируется до первого события и забирает все накопившиеся. Возвращает список событий."""
+        events = [self._events.get()]
+        while True:
+            try:
+                events.append(self._events.get_nowait())
+            except queue.Empty:
+                break
+        return events
+
+    def _rebuild_logical_dependencies(self):
+        self.node_dependencies_graph.clear()
+        for source_node_id, _, target_node_id, _ in self.logical_links:
+            self.node_dependencies_graph[source_node_id].add(target_node_id)
 
     def _rebuild_dependency_structures(self):
         self.node_dependencies_graph.clear()
         # --- ОБНОВЛЕНИЕ НОВОЙ КАРТЫ ДАННЫХ ---
         self.link_data_map.clear()
+        self.logical_links = []
         # ---
 
         for source_attr_id, target_attr_id in self.attribute_links:
@@ -58,124 +254,660 @@ class ExecutionManager:
                     self.node_dependencies_graph[source_node_id].add(target_node_id)
                     # --- ЗАПОЛНЯЕМ НОВУЮ КАРТУ ДАННЫХ ---
                     self.link_data_map[target_attr_id] = (source_node_id, source_key, target_key)
-                    print(f"ExecutionManager: Linked {source_node_id}.{source_key} -> {target_node_id}.{target_key}")
+                    self.logical_links.append((source_node_id, source_key, target_node_id, target_key))
+                    log.debug("Linked %s.%s -> %s.%s", source_node_id, source_key, target_node_id, target_key)
                 else:
-                    print(f"ExecutionManager: Invalid link direction or types: {source_attr_type} -> {target_attr_type}")
+                    log.warning("Invalid link direction or types: %s -> %s", source_attr_type, target_attr_type)
             else:
-                print(f"ExecutionManager: Could not resolve link endpoints for IDs {source_attr_id} -> {target_attr_id}")
+                log.warning("Could not resolve link endpoints for IDs %s -> %s", source_attr_id, target_attr_id)
 
-        print(f"ExecutionManager: Dependency graph and data map rebuilt.")
+        log.debug("Dependency graph and data map rebuilt.")
 
+    # --- Пакетные изменения ---
+    @contextmanager
+    def batch(self):
+        """
+        Откладывает пересборку связей и плана и пометку нод до выхода из блока:
+        создание N нод и L связей стоит одной пересборки O(N + L) вместо пересборки на каждый вызов.
+        Пакеты могут быть вложенными; пересборка выполняется при выходе из внешнего.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self._commit_batch()
 
-    def _propagate_data(self):
-        """Передаёт данные от выходов к входам по связям."""
-        for target_attr_id, (source_node_id, source_output_key, target_input_key) in self.link_data_map.items():
+    def _commit_batch(self):
+        pending, self._batch_pending = self._batch_pending, set()
+        if not pending:
+            return
+        if "links" in pending:
+            self._rebuild_dependency_structures()
+        elif "logical_links" in pending:
+            self._rebuild_logical_dependencies()
+        if "plan" in pending:
+            self._rebuild_plan()
+        if "dirty" in pending:
+            self.mark_all_dirty()
+        log.info("Committed graph batch: %d nodes, %d links", len(self.node_instances), len(self.logical_links))
+
+    def _rebuild_plan(self):
+        """Компилирует новый план выполнения и подменяет текущий."""
+        if self._batch_depth:
+            self._batch_pending.add("plan")
+            return
+        with self._plan_lock:
+            plan = compile_plan(dict(self.node_instances), self.logical_links, fuse=self.fusion_enabled)
+            if plan.has_cycle:
+                log.warning("Cycle detected in node dependencies.")
+            self.plan = plan
+        log.debug("Execution plan compiled for %d nodes (%d fused groups).", len(plan), len(plan.groups))
+        if self.recorder is not None:
+            self.recorder.write_graph(dict(self.node_instances), self.logical_links)
+        self._seed_links(plan)
+
+
+    def _seed_links(self, plan):
+        """
+        Передаёт текущие выходы по всем связям плана. Нужно один раз после пересборки:
+        новая связь должна получить значение, вычисленное до её появления.
+        Дальше значения передаются только при изменении (on_output_changed).
+        """
+        for source_node_id, by_key in plan.fanout.items():
             source_node_instance = self.node_instances.get(source_node_id)
+            if not source_node_instance:
+                log.warning("Source node instance for ID %s not found.", source_node_id)
+                continue
+            source_outputs = source_node_instance.state["outputs"]
+            for source_key, targets in by_key.items():
+                value = source_outputs.get(source_key)
+                if value is None:
+                    continue
+                for target_node_id, target_key in targets:
+                    target_node_instance = self.node_instances.get(target_node_id)
+                    if target_node_instance:
+                        target_value = link_value(value, target_node_instance)
+                        if target_value is not None:
+                            target_node_instance.set_input_value_from_link(target_key, target_value)
 
-            if source_node_instance:
-                # Получаем значение из выхода источника
-                source_value = source_node_instance.state["outputs"].get(source_output_key)
-                if source_value is not None:
-                    # Найдём target_node_instance и target_input_key
-                    target_info = BaseNode.attr_id_to_key_map.get(target_attr_id)
-                    if target_info:
-                        _, _, resolved_target_input_key = target_info
-                        # Найдём экземпляр target ноды
-                        target_node_instance = self.node_instances.get(target_info[0]) # target_node_id
-                        if target_node_instance:
-                            # Устанавливаем значение во вход получателя
-                            target_node_instance.set_input_value_from_link(resolved_target_input_key, source_value)
-                            print(f"ExecutionManager: Propagated '{source_value}' from {source_node_instance.label}.{source_output_key} to {target_node_instance.label}.{resolved_target_input_key}")
-                        else:
-                            print(f"ExecutionManager: Target node instance for {target_info[0]} not found.")
-                    else:
-                        print(f"ExecutionManager: Target info for attr ID {target_attr_id} not found in BaseNode map.")
+    def _run_node(self, plan, node_id, node_instance):
+        """Выполняет одну ноду; её изменившиеся выходы уходят потомкам из set_output_value()."""
+        if node_id in plan.async_nodes:
+            self._submit_async(node_id, node_instance)
+            return
+        recorder = self.recorder
+        if recorder is None:
+            self._process_node(node_id, node_instance)
+            return
+        captured = recorder.capture_inputs(node_instance)
+        started = time.perf_counter()
+        self._process_node(node_id, node_instance)
+        recorder.record(captured, time.perf_counter() - started)
+
+    def _process_node(self, node_id, node_instance):
+        log.debug("Processing node %s (ID: %s)", node_instance.label, node_id)
+        memo_key = self._memo_lookup(node_instance)
+        if memo_key is True:
+            return
+        profiler = self.profiler
+        if profiler.enabled:
+            wall_started = time.perf_counter()
+            cpu_started = time.thread_time()
+        error = False
+        self._in_node.active = True
+        try:
+            node_instance.process()
+        except Exception as e:
+            error = True
+            log.error("Error processing node %s (ID: %s): %s", node_instance.label, node_id, e)
+        finally:
+            self._in_node.active = False
+        if profiler.enabled:
+            profiler.record_process(node_id, node_instance.label,
+                                    time.perf_counter() - wall_started,
+                                    time.thread_time() - cpu_started, error)
+        if memo_key is not None and not error:
+            self.memo.put(memo_key, dict(node_instance.state["outputs"]))
+
+    def _run_tick(self, plan):
+        """Один такт: выполняет грязные ноды плана. Возвращает число выполненных нод."""
+        # Выполняем только грязные ноды; их потомки становятся грязными,
+        # когда до них доходит изменившееся значение
+        profiling = self.profiler.enabled
+        if profiling:
+            self.profiler.begin_tick()
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.begin_tick()
+        self.tick_stats["ticks"] += 1
+        deadline = time.perf_counter() + self.tick_budget if self.tick_budget else None
+        executed = 0
+        if self.parallel_execution or self.process_pool_enabled:
+            for level in plan.levels:
+                if self._stop_requested():
+                    break
+                if deadline is not None and time.perf_counter() > deadline:
+                    self._defer_rest(plan)
+                    break
+                ready = [(node_id, node_instance) for node_id, node_instance in level if node_instance.dirty]
+                for _, node_instance in ready:
+                    node_instance.dirty = False
+                if ready:
+                    self._run_level(plan, ready)
+                executed += len(ready)
+        else:
+            for node_id, node_instance in plan.nodes:
+                if self._stop_requested():
+                    break
+                if not node_instance.dirty:
+                    continue
+                if deadline is not None and time.perf_counter() > deadline:
+                    self._defer_rest(plan)
+                    break
+                node_instance.dirty = False
+                if self.node_timeout:
+                    self._run_guarded(plan, ((node_id, node_instance),))
                 else:
-                    print(f"ExecutionManager: Source output value for {source_node_instance.label}.{source_output_key} is None.")
-            else:
-                print(f"ExecutionManager: Source node instance for ID {source_node_id} not found.")
+                    self._run_node(plan, node_id, node_instance)
+                executed += 1
 
+        if profiling:
+            self.profiler.end_tick(executed)
+        if recorder is not None:
+            recorder.end_tick()
+        if executed:
+            log.debug("Executed %d of %d nodes", executed, len(plan))
+        return executed
 
-    def _topological_sort(self):
-        in_degree = {node_id: 0 for node_id in self.node_instances}
-        for node_id, dependents in self.node_dependencies_graph.items():
-            for dep_node_id in dependents:
-                if dep_node_id in in_degree:
-                    in_degree[dep_node_id] += 1
+    # --- Memo-кэш ---
+    def _memo_lookup(self, node_instance):
+        """
+        Для чистой ноды ищет результат в кэше. True — результат найден и применён,
+        process() не нужен; строка — ключ, под которым сохранить результат; None — не кэшируется.
+        """
+        if not node_instance.pure or not self.memo.enabled:
+            return None
+        inputs = node_instance.resolved_inputs()
+        if not self.memo.accepts(inputs):
+            # Большие массивы: хеш стоил бы дороже самого вычисления
+            return None
+        try:
+            memo_key = node_instance.memo_key(inputs)
+        except TypeError as e:
+            log.debug("Node %s is not memoizable: %s", node_instance.label, e)
+            return None
+        outputs = self.memo.get(memo_key)
+        if outputs is None:
+            return memo_key
+        self._in_node.active = True
+        try:
+            for key, value in outputs.items():
+                node_instance.set_output_value(key, value)
+        finally:
+            self._in_node.active = False
+        log.debug("Memo hit for node %s", node_instance.label)
+        return True
 
-        queue = deque([node_id for node_id, degree in in_degree.items() if degree == 0])
-        sorted_order = []
+    def set_memo(self, enabled, max_size=None, max_bytes=None):
+        """Включает/выключает memo-кэш чистых нод и задаёт его пределы (записи, байты)."""
+        self.memo.enabled = bool(enabled)
+        if max_size is not None or max_bytes is not None:
+            self.memo.resize(max_size, max_bytes)
+        log.info("Memo cache %s (%d entries, %.0f MB max)",
+                 "enabled" if self.memo.enabled else "disabled", self.memo.max_size,
+                 self.memo.max_bytes / (1024 * 1024))
 
-        while queue:
-            current_node_id = queue.popleft()
-            sorted_order.append(current_node_id)
+    # --- Ограничения времени ---
+    def _defer_rest(self, plan):
+        """Бюджет такта исчерпан: оставшиеся грязные ноды ждут следующего такта."""
+        deferred = sum(1 for _, node_instance in plan.nodes if node_instance.dirty)
+        self.tick_stats["overrun_ticks"] += 1
+        self.tick_stats["deferred_nodes"] += deferred
+        log.debug("Tick budget exceeded, %d nodes deferred", deferred)
+        # В событийном режиме без нового события отложенные ноды не выполнятся
+        self.post_event("deferred")
 
-            for dependent_node_id in self.node_dependencies_graph.get(current_node_id, set()):
-                if dependent_node_id in in_degree:
-                    in_degree[dependent_node_id] -= 1
-                    if in_degree[dependent_node_id] == 0:
-                        queue.append(dependent_node_id)
+    def _run_guarded(self, plan, items):
+        """
+        Выполняет ноды в пуле потоков и ждёт каждую не дольше node_timeout.
+        items выполняются одновременно только при включённом parallel_execution.
+        Не уложившаяся нода дорабатывает в фоне; пока она не завершится, новые
+        запуски этой ноды откладываются. Нода, не успевшая начаться (все потоки
+        заняты), не считается опоздавшей и переносится на следующий такт.
+        """
+        batches = (items,) if self.parallel_execution else tuple((item,) for item in items)
+        for batch in batches:
+            pool = self._get_guard_pool()
+            futures = {}
+            for node_id, node_instance in batch:
+                if node_id in self._late:
+                    node_instance.dirty = True
+                    self.tick_stats["deferred_nodes"] += 1
+                    continue
+                futures[pool.submit(self._run_node, plan, node_id, node_instance)] = (node_id, node_instance)
+            if not futures:
+                continue
+            _, not_done = wait(futures, timeout=self.node_timeout)
+            late = False
+            for future in not_done:
+                node_id, node_instance = futures[future]
+                if future.cancel():
+                    node_instance.dirty = True
+                    self.tick_stats["deferred_nodes"] += 1
+                else:
+                    self._mark_late(node_id, node_instance, future)
+                    late = True
+            if late:
+                # Опоздавшие ноды занимают потоки пула до своего завершения. Пул выводится
+                # из работы (его потоки дорабатывают и завершаются), следующие ноды
+                # получают новый пул со всеми свободными потоками
+                self._guard_pool.shutdown(wait=False)
+                self._guard_pool = None
 
-        if len(sorted_order) != len(self.node_instances):
-            print("ExecutionManager: WARNING - Cycle detected in node dependencies.")
-            return []
+    def _mark_late(self, node_id, node_instance, future):
+        self._late[node_id] = future
+        self.tick_stats["timed_out_nodes"] += 1
+        log.warning("Node %s (ID: %s) exceeded timeout of %.3f s, continuing without it",
+                    node_instance.label, node_id, self.node_timeout)
+        future.add_done_callback(lambda f: self._finish_late(node_id))
 
-        return sorted_order
+    def _finish_late(self, node_id):
+        """Опоздавшая нода завершилась: её выходы уже переданы, будим планировщик."""
+        self._late.pop(node_id, None)
+        self.post_event("late", node_id)
 
-    def _execute_loop(self):
-        while self.running:
+    def _submit_async(self, node_id, node_instance):
+        """Отправляет корутину process() на AsyncExecutor и сразу возвращается."""
+        if node_id in self._async_in_flight:
+            # Предыдущий вызов ещё выполняется — пересчитаем после его завершения
+            node_instance.dirty = True
+            return
+        log.debug("Submitting async node %s (ID: %s)", node_instance.label, node_id)
+        captured = self.recorder.capture_inputs(node_instance) if self.recorder is not None else None
+        submitted = time.perf_counter()
+        future = self.async_executor.submit(node_instance.process)
+        self._async_in_flight[node_id] = future
+        future.add_done_callback(
+            lambda f: self._finish_async(node_id, node_instance, f, submitted, captured))
+
+    def _finish_async(self, node_id, node_instance, future, submitted, captured=None):
+        """Callback завершения корутины (выполняется в потоке event loop)."""
+        self._async_in_flight.pop(node_id, None)
+        error = False
+        if future.cancelled():
+            log.debug("Async node %s (ID: %s) cancelled", node_instance.label, node_id)
+            return
+        exception = future.exception()
+        if exception is not None:
+            error = True
+            log.error("Error processing async node %s (ID: %s): %s", node_instance.label, node_id, exception)
+        if self.profiler.enabled:
+            # Время ожидания I/O входит в wall; CPU-время корутины не измеряется
+            self.profiler.record_process(node_id, node_instance.label,
+                                         time.perf_counter() - submitted, 0.0, error)
+        recorder = self.recorder
+        if recorder is not None and captured is not None:
+            # Корутина завершается вне такта — запись попадает в текущий такт, если он идёт
+            recorder.record(captured, time.perf_counter() - submitted)
+        if node_instance.dirty:
+            # Входы изменились, пока корутина выполнялась
+            self.post_event("async", node_id)
+
+    @property
+    def pending_background(self):
+        """Число нод, выполняющихся в фоне: корутины async-нод и ноды, превысившие node_timeout."""
+        return len(self._async_in_flight) + len(self._late)
+
+    def wait_for_background(self, timeout=None):
+        """Ждёт завершения нод, выполняющихся в фоне. Возвращает True, если все завершились."""
+        futures = list(self._async_in_flight.values()) + list(self._late.values())
+        if not futures:
+            return True
+        _, not_done = wait(futures, timeout=timeout)
+        return not not_done
+
+    def run_once(self):
+        """Синхронно выполняет один такт в текущем потоке. Возвращает число выполненных нод."""
+        plan = self.plan
+        if not plan.order:
+            return 0
+        with self._tick_lock:
+            return self._run_tick(plan)
+
+    def evaluate(self, node_ids, wait_async=True, timeout=None):
+        """
+        Выполняет один раз только node_ids и их предков в текущем потоке.
+        Чистые (не грязные) ноды не пересчитываются — используются их текущие выходы.
+        С wait_async ждёт async-ноды подграфа и досчитывает их потомков.
+        Если идёт такт цикла выполнения, ждёт его окончания.
+        Возвращает отчёт: выполненные ноды со временем, число переиспользованных, выходы целей.
+        """
+        plan = self.plan
+        node_ids = [node_id for node_id in node_ids if node_id in self.node_instances]
+        ancestors = plan.ancestors(node_ids)
+        units = plan.units_for(ancestors)
+        unit_ids = {unit_id for unit_id, _ in units}
+        report = {"targets": node_ids, "nodes": len(ancestors), "executed": [], "reused": 0,
+                  "total_ms": 0.0, "outputs": {}}
+        if plan.has_cycle:
+            log.warning("Cannot evaluate: cycle detected in node dependencies.")
+            return report
+
+        started = time.perf_counter()
+        deadline = started + timeout if timeout else None
+        executed_ids = set()
+        with self._tick_lock:
+            recorder = self.recorder
+            if recorder is not None:
+                recorder.begin_tick()
             try:
-                execution_order = self._topological_sort()
-                if not execution_order:
-                    time.sleep(1.0 / max(1, self.execution_speed))
+                while True:
+                    for unit_id, unit in units:
+                        if not unit.dirty:
+                            continue
+                        unit.dirty = False
+                        unit_started = time.perf_counter()
+                        if self.node_timeout:
+                            self._run_guarded(plan, ((unit_id, unit),))
+                        else:
+                            self._run_node(plan, unit_id, unit)
+                        executed_ids.add(unit_id)
+                        report["executed"].append({"node_id": unit_id, "label": unit.label,
+                                                   "ms": (time.perf_counter() - unit_started) * 1000.0})
+                    # Async-ноды подграфа досчитываются в фоне; их результаты делают потомков грязными
+                    pending = [future for unit_id, future in list(self._async_in_flight.items())
+                               if unit_id in unit_ids]
+                    if not wait_async or not pending:
+                        break
+                    remaining = deadline - time.perf_counter() if deadline is not None else None
+                    if remaining is not None and remaining <= 0:
+                        break
+                    _, not_done = wait(pending, timeout=remaining)
+                    if not_done:
+                        log.warning("Evaluate timed out waiting for %d async nodes", len(not_done))
+                        break
+            finally:
+                if recorder is not None:
+                    recorder.end_tick()
+
+        report["total_ms"] = (time.perf_counter() - started) * 1000.0
+        report["reused"] = len(units) - len(executed_ids)
+        report["outputs"] = {node_id: dict(self.node_instances[node_id].state["outputs"])
+                             for node_id in node_ids}
+        log.info("Evaluated %d nodes (%d executed, %d reused) in %.2f ms",
+                 len(ancestors), len(executed_ids), report["reused"], report["total_ms"])
+        return report
+
+    def _stop_requested(self):
+        # Такт из потока выполнения прерывается по stop_execution();
+        # синхронный run_once() выполняется до конца
+        return self.execution_thread is not None and not self.running
+
+    def _run_level(self, plan, ready):
+        """
+        Выполняет готовые ноды одного уровня зависимостей. Следующий уровень
+        стартует только после завершения всех нод текущего.
+        """
+        remote = []
+        local = ready
+        if self.process_pool_enabled:
+            # Ноды с compute_function уходят в процессы первыми, чтобы считаться
+            # одновременно с остальными нодами уровня
+            process_pool = self._get_process_pool()
+            local = []
+            for node_id, node_instance in ready:
+                if node_instance.compute_function is None:
+                    local.append((node_id, node_instance))
+                    continue
+                if node_id in self._late:
+                    # Предыдущий запуск ещё считается в процессе
+                    node_instance.dirty = True
+                    self.tick_stats["deferred_nodes"] += 1
+                    continue
+                memo_key = self._memo_lookup(node_instance)
+                if memo_key is True:
                     continue
+                future = self._submit_compute(process_pool, node_instance)
+                if future is None:
+                    local.append((node_id, node_instance))
+                else:
+                    captured = self.recorder.capture_inputs(node_instance) if self.recorder is not None else None
+                    remote.append((node_id, node_instance, future, time.perf_counter(), memo_key, captured))
+
+        if self.node_timeout:
+            self._run_guarded(plan, local)
+        elif self.parallel_execution and len(local) > 1:
+            pool = self._get_thread_pool()
+            wait([pool.submit(self._run_node, plan, node_id, node_instance)
+                  for node_id, node_instance in local])
+        else:
+            for node_id, node_instance in local:
+                self._run_node(plan, node_id, node_instance)
+
+        if remote and self.node_timeout:
+            # Процессы считают одновременно с локальными нодами уровня; ждём их не дольше node_timeout
+            wait([item[2] for item in remote], timeout=self.node_timeout)
+        for node_id, node_instance, future, submitted, memo_key, captured in remote:
+            if future.done():
+                self._finish_compute(plan, node_id, node_instance, future, submitted, memo_key, captured)
+            elif future.cancel():
+                # Не начала выполняться (все процессы заняты) — не таймаут, а перенос на следующий такт
+                node_instance.dirty = True
+                self.tick_stats["deferred_nodes"] += 1
+            else:
+                # Результат применится, когда процесс завершится; такт идёт дальше без ноды
+                future.add_done_callback(
+                    lambda f, node_id=node_id, node_instance=node_instance, submitted=submitted,
+                    memo_key=memo_key, captured=captured:
+                    self._finish_compute(plan, node_id, node_instance, f, submitted, memo_key, captured))
+                self._mark_late(node_id, node_instance, future)
 
-                # --- ПЕРЕДАЁМ ДАННЫЕ ---
-                self._propagate_data()
-                # ---
+    def _submit_compute(self, process_pool, node_instance):
+        """Отправляет compute_function ноды в пул процессов. None — нода выполняется локально."""
+        compute_function = node_instance.compute_function
+        if compute_function is None:
+            return None
+        inputs = node_instance.get_compute_inputs()
+        if any(value is None for value in inputs.values()):
+            # Пусть process() сам обработает неполные входы
+            return None
+        return process_pool.submit(compute_function, **inputs)
 
-                print(f"ExecutionManager: Executing {len(execution_order)} nodes in order: {execution_order}")
-                for node_id in execution_order:
+    def _finish_compute(self, plan, node_id, node_instance, future, submitted, memo_key=None, captured=None):
+        """Переносит результат из дочернего процесса в state["outputs"] и UI."""
+        error = False
+        self._in_node.active = True
+        try:
+            node_instance.apply_compute_result(future.result())
+        except Exception as e:
+            error = True
+            log.error("Error computing node %s (ID: %s) in process pool: %s", node_instance.label, node_id, e)
+        finally:
+            self._in_node.active = False
+        if self.profiler.enabled:
+            # CPU-время дочернего процесса недоступно; wall — от отправки до применения результата
+            self.profiler.record_process(node_id, node_instance.label,
+                                         time.perf_counter() - submitted, 0.0, error)
+        if memo_key is not None and not error:
+            self.memo.put(memo_key, dict(node_instance.state["outputs"]))
+        if self.recorder is not None and captured is not None:
+            self.recorder.record(captured, time.perf_counter() - submitted)
+
+    def _execute_loop(self):
+        next_tick = time.perf_counter()
+        while self.running:
+            try:
+                if self.event_driven:
+                    # Пачка событий обрабатывается одним тактом; грязные флаги
+                    # ограничивают его затронутым подграфом
+                    events = self._wait_for_events()
                     if not self.running:
                         break
-                    node_instance = self.node_instances.get(node_id)
-                    if node_instance:
-                        print(f"ExecutionManager: Processing node {node_instance.label} (ID: {node_id})")
-                        try:
-                            node_instance.process()
-                        except Exception as e:
-                            print(f"ExecutionManager: Error processing node {node_instance.label} (ID: {node_id}): {e}")
-                    else:
-                        print(f"ExecutionManager: WARNING - Node instance for ID {node_id} not found.")
-
-                time.sleep(1.0 / max(1, self.execution_speed))
+                    if log.isEnabledFor(logging.DEBUG):
+                        log.debug("Woke on %d events: %s", len(events), sorted({kind for kind, _ in events}))
+
+                # Берём ссылку на план один раз за такт: пересборка в UI-потоке
+                # подменит её целиком и не затронет текущий такт
+                plan = self.plan
+                if plan.order:
+                    with self._tick_lock:
+                        self._run_tick(plan)
+
+                if not self.event_driven:
+                    # Такты идут по расписанию; если такт не уложился в период,
+                    # пропущенные такты не догоняются, а учитываются в статистике
+                    period = 1.0 / self.execution_speed
+                    next_tick += period
+                    now = time.perf_counter()
+                    if now > next_tick:
+                        skipped = int((now - next_tick) / period) + 1
+                        self.tick_stats["skipped_ticks"] += skipped
+                        log.debug("Tick overran its period, skipped %d ticks", skipped)
+                        next_tick += skipped * period
+                    time.sleep(max(0.0, next_tick - now))
+                else:
+                    next_tick = time.perf_counter()
 
             except Exception as e:
-                print(f"ExecutionManager: Critical error in execution loop: {e}")
+                log.exception("Critical error in execution loop: %s", e)
                 self.stop_execution()
                 break
 
+    # --- Параллельное выполнение независимых веток ---
+    def _get_thread_pool(self):
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                   thread_name_prefix="node-worker")
+        return self._thread_pool
+
+    def _get_guard_pool(self):
+        if self._guard_pool is None:
+            self._guard_pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                  thread_name_prefix="node-guarded")
+        return self._guard_pool
+
+    def _shutdown_thread_pool(self):
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(wait=False)
+            self._thread_pool = None
+        if self._guard_pool is not None:
+            self._guard_pool.shutdown(wait=False)
+            self._guard_pool = None
+
+    # --- Выполнение CPU-нагруженных нод в отдельных процессах ---
+    def _get_process_pool(self):
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(max_workers=self.process_workers)
+        return self._process_pool
+
+    def _shutdown_process_pool(self):
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+
+    def set_process_pool_execution(self, enabled, max_workers=None):
+        """Включает/выключает выполнение compute_function нод в ProcessPoolExecutor."""
+        self.process_pool_enabled = bool(enabled)
+        if max_workers is not None and max(1, int(max_workers)) != self.process_workers:
+            self.process_workers = max(1, int(max_workers))
+            self._shutdown_process_pool()
+        if not self.process_pool_enabled:
+            self._shutdown_process_pool()
+        log.info("Process pool execution %s (%d processes)",
+                 "enabled" if self.process_pool_enabled else "disabled", self.process_workers)
+
+    def set_parallel_execution(self, enabled, max_workers=None):
+        """Включает/выключает параллельное выполнение нод одного уровня зависимостей."""
+        self.parallel_execution = bool(enabled)
+        if max_workers is not None and max(1, int(max_workers)) != self.max_workers:
+            self.max_workers = max(1, int(max_workers))
+            # Пул с новым размером будет создан при следующем такте
+            self._shutdown_thread_pool()
+        log.info("Parallel execution %s (%d workers)",
+                 "enabled" if self.parallel_execution else "disabled", self.max_workers)
+
+    # --- Трасса выполнения ---
+    def start_recording(self, path):
+        """Начинает запись трассы в файл path (JSON Lines, дозапись)."""
+        self.stop_recording()
+        recorder = TraceRecorder(path)
+        recorder.write_graph(dict(self.node_instances), self.logical_links)
+        self.recorder = recorder
+        log.info("Recording execution trace to %s", path)
+        return path
+
+    def stop_recording(self):
+        recorder, self.recorder = self.recorder, None
+        if recorder is not None:
+            recorder.close()
+
+    def set_fusion(self, enabled):
+        """Включает/выключает слияние цепочек арифметических нод и пересобирает план."""
+        self.fusion_enabled = bool(enabled)
+        self._rebuild_plan()
+        self.mark_all_dirty()
+        log.info("Node fusion %s (%d groups)", "enabled" if self.fusion_enabled else "disabled",
+                 len(self.plan.groups))
+
+    def set_time_limits(self, node_timeout=None, tick_budget=None):
+        """Задаёт таймаут ноды и бюджет такта в секундах (0 или None — без ограничения)."""
+        self.node_timeout = node_timeout or None
+        self.tick_budget = tick_budget or None
+        log.info("Node timeout: %s, tick budget: %s",
+                 f"{self.node_timeout:.3f} s" if self.node_timeout else "off",
+                 f"{self.tick_budget:.3f} s" if self.tick_budget else "off")
+
+    def reset_tick_stats(self):
+        for key in self.tick_stats:
+            self.tick_stats[key] = 0
+
+    def set_async_concurrency(self, max_concurrency):
+        """Лимит одновременно выполняемых корутин async-нод."""
+        self.async_executor.set_max_concurrency(max_concurrency)
+
+    def set_event_driven(self, enabled):
+        """Переключает планировщик между событийным режимом и опросом с частотой execution_speed."""
+        self.event_driven = bool(enabled)
+        # Будим поток выполнения, чтобы он сразу перешёл в новый режим
+        self._events.put(("wake", None))
+        log.info("%s scheduling", "Event-driven" if self.event_driven else "Fixed-rate")
+
     def start_execution(self):
         if not self.running and self.execution_thread is None:
+            # Первый такт после запуска пересчитывает весь граф
+            self.mark_all_dirty()
             self.running = True
             self.execution_thread = threading.Thread(target=self._execute_loop, daemon=True)
             self.execution_thread.start()
-            print("ExecutionManager: Started execution loop.")
+            log.info("Started execution loop.")
         else:
-            print("ExecutionManager: Execution is already running or thread is active.")
+            log.warning("Execution is already running or thread is active.")
 
     def stop_execution(self):
         if self.running:
             self.running = False
-            if self.execution_thread:
+            # Будим поток, если он ждёт событий
+            self._events.put(("stop", None))
+            if self.execution_thread and self.execution_thread is not threading.current_thread():
                 self.execution_thread.join(timeout=2)
-                self.execution_thread = None
-            print("ExecutionManager: Stopped execution loop.")
+            self.execution_thread = None
+            self.shutdown()
+            log.info("Stopped execution loop.")
         else:
-            print("ExecutionManager: Execution is not running.")
+            log.warning("Execution is not running.")
+
+    def shutdown(self):
+        """Освобождает пулы потоков и процессов и event loop async-нод (например, после run_once())."""
+        self._shutdown_thread_pool()
+        self._shutdown_process_pool()
+        self.async_executor.shutdown()
+        self._async_in_flight.clear()
+        self._late.clear()
 
     def set_execution_speed(self, speed):
         self.execution_speed = max(0.1, speed)
-        print(f"ExecutionManager: Set execution speed to {speed} Hz")
+        log.info("Set execution speed to %s Hz", speed)
 
-execution_manager = ExecutionManager()
\ No newline at end of file
+execution_manager = ExecutionManager()
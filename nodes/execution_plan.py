@@ -0,0 +1,156 @@
+# nodes/execution_plan.py
+
+import inspect
+from collections import defaultdict, deque
+
+from .graph_compiler import build_fused_groups
+
+
+class ExecutionPlan:
+    """
+    Скомпилированный план выполнения графа. После создания не изменяется:
+    ExecutionManager собирает новый план при изменении топологии и подменяет
+    ссылку целиком, поэтому поток выполнения всегда видит согласованный план.
+    """
+
+    __slots__ = ("order", "nodes", "levels", "input_bindings", "fanout", "async_nodes", "groups", "has_cycle")
+
+    def __init__(self, order, nodes, input_bindings, fanout, levels=(), async_nodes=frozenset(),
+                 groups=(), has_cycle=False):
+        # Кортеж node_id в топологическом порядке
+        self.order = order
+        # Кортеж (node_id, node_instance) в том же порядке
+        self.nodes = nodes
+        # Уровни зависимостей: кортеж кортежей (node_id, node_instance).
+        # Ноды одного уровня не зависят друг от друга и могут выполняться параллельно
+        self.levels = levels
+        # {target_node_id: ((target_key, source_node_id, source_key), ...)}
+        self.input_bindings = input_bindings
+        # Список смежности по выходам: {source_node_id: {source_key: ((target_node_id, target_key), ...)}}.
+        # По нему set_output_value() сразу передаёт изменившееся значение получателям
+        self.fanout = fanout
+        # node_id нод с async def process(): они выполняются на AsyncExecutor, не блокируя такт
+        self.async_nodes = async_nodes
+        # Слитые группы арифметических нод (FusedGroup); в order/nodes/levels
+        # группа стоит вместо своих нод
+        self.groups = groups
+        self.has_cycle = has_cycle
+
+    @classmethod
+    def empty(cls):
+        return cls((), (), {}, {})
+
+    def __len__(self):
+        return len(self.order)
+
+    def ancestors(self, node_ids):
+        """node_ids и все ноды, от которых они зависят (по входным связям)."""
+        found = set()
+        stack = list(node_ids)
+        while stack:
+            node_id = stack.pop()
+            if node_id in found:
+                continue
+            found.add(node_id)
+            stack.extend(source_node_id for _, source_node_id, _ in self.input_bindings.get(node_id, ()))
+        return found
+
+    def units_for(self, node_ids):
+        """
+        Единицы плана (node_id или FusedGroup.node_id), которые нужно выполнить,
+        чтобы посчитать node_ids, — в порядке выполнения.
+        """
+        node_ids = set(node_ids)
+        wanted = set(node_ids)
+        for group in self.groups:
+            if any(member.node_id in node_ids for member in group.members):
+                wanted.add(group.node_id)
+        return tuple((unit_id, unit) for unit_id, unit in self.nodes if unit_id in wanted)
+
+
+def _sort(unit_ids, dependents):
+    """
+    Топологическая сортировка (алгоритм Кана).
+    Возвращает (order, level_of); при цикле order короче unit_ids.
+    """
+    in_degree = {unit_id: 0 for unit_id in unit_ids}
+    for unit_id, targets in dependents.items():
+        for target_id in targets:
+            in_degree[target_id] += 1
+
+    queue = deque([unit_id for unit_id, degree in in_degree.items() if degree == 0])
+    order = []
+    # Уровень ноды = 1 + максимальный уровень её источников
+    level_of = {unit_id: 0 for unit_id in queue}
+    while queue:
+        current_id = queue.popleft()
+        order.append(current_id)
+        for target_id in dependents.get(current_id, ()):
+            level_of[target_id] = max(level_of.get(target_id, 0), level_of[current_id] + 1)
+            in_degree[target_id] -= 1
+            if in_degree[target_id] == 0:
+                queue.append(target_id)
+    return order, level_of
+
+
+def compile_plan(node_instances, links, fuse=False):
+    """
+    Строит ExecutionPlan.
+    node_instances: {node_id: node_instance}
+    links: итерируемое из (source_node_id, source_key, target_node_id, target_key)
+    fuse: сливать цепочки арифметических нод в одну функцию (graph_compiler);
+    слитая группа занимает в order/nodes/levels одно место вместо своих нод
+    """
+    links = list(links)
+    bindings = defaultdict(list)
+    fanout = defaultdict(lambda: defaultdict(list))
+    dependents = defaultdict(set)
+
+    for source_node_id, source_key, target_node_id, target_key in links:
+        if source_node_id not in node_instances or target_node_id not in node_instances:
+            continue
+        bindings[target_node_id].append((target_key, source_node_id, source_key))
+        fanout[source_node_id][source_key].append((target_node_id, target_key))
+        dependents[source_node_id].add(target_node_id)
+
+    order, level_of = _sort(node_instances, dependents)
+    has_cycle = len(order) != len(node_instances)
+    if has_cycle:
+        order = []
+
+    units = node_instances
+    groups = ()
+    if fuse and order:
+        groups = tuple(build_fused_groups(node_instances, links, order))
+    if groups:
+        # Стягиваем каждую группу в одну вершину и сортируем заново
+        unit_of = {node_id: node_id for node_id in node_instances}
+        units = dict(node_instances)
+        for group in groups:
+            for member in group.members:
+                unit_of[member.node_id] = group.node_id
+                del units[member.node_id]
+            units[group.node_id] = group
+        unit_dependents = defaultdict(set)
+        for source_node_id, targets in dependents.items():
+            for target_node_id in targets:
+                if unit_of[source_node_id] != unit_of[target_node_id]:
+                    unit_dependents[unit_of[source_node_id]].add(unit_of[target_node_id])
+        order, level_of = _sort(units, unit_dependents)
+
+    levels = defaultdict(list)
+    for unit_id in order:
+        levels[level_of[unit_id]].append((unit_id, units[unit_id]))
+
+    return ExecutionPlan(
+        order=tuple(order),
+        nodes=tuple((unit_id, units[unit_id]) for unit_id in order),
+        input_bindings={node_id: tuple(items) for node_id, items in bindings.items()},
+        fanout={node_id: {key: tuple(targets) for key, targets in by_key.items()}
+                for node_id, by_key in fanout.items()},
+        levels=tuple(tuple(levels[level]) for level in sorted(levels)),
+        async_nodes=frozenset(unit_id for unit_id in order
+                              if inspect.iscoroutinefunction(units[unit_id].process)),
+        groups=groups,
+        has_cycle=has_cycle,
+    )
@@ -1,18 +1,23 @@
 # nodes/factory.py (обновлённая версия)
 
 import dearpygui.dearpygui as dpg
-import tkinter as tk
-from tkinter import filedialog
+import threading
 
 from nodes.tabs import EditorTab, LLMTab, OtherTab
 from nodes.registry import create_node_instance, NODE_REGISTRY, change_theme
 from nodes.execution_manager import execution_manager
 from nodes.state_manager import state_manager
+from nodes.log import ring_buffer
+from nodes.palette import palette
+from nodes.culling import viewport_culler
+from nodes.ui_queue import ui_queue
 
 
 # === Вспомогательные функции ===
 
 def get_screen_size():
+    # tkinter нужен только здесь — не загружаем его при импорте модуля
+    import tkinter as tk
     root = tk.Tk()
     root.withdraw()
     screen_width = root.winfo_screenwidth()
@@ -55,6 +60,35 @@ def toggle_run_callback(sender, app_data, user_data):
         dpg.configure_item("status_text", label="Stopped")
 
 
+# === Вычисление выбранных нод по запросу ===
+
+_evaluate_thread = None
+
+
+def evaluate_selected_callback(sender, app_data, user_data):
+    """Считает выбранные ноды и их предков один раз, не запуская цикл выполнения."""
+    global _evaluate_thread
+    selected_nodes = dpg.get_selected_nodes("node_editor")
+    if not selected_nodes:
+        dpg.set_value("status_text", "Status: select nodes to evaluate")
+        return
+    if _evaluate_thread is not None and _evaluate_thread.is_alive():
+        dpg.set_value("status_text", "Status: evaluation is already running")
+        return
+
+    def run():
+        # Не блокируем UI: медленные ноды (LLaMA, Qdrant) считаются в отдельном потоке
+        report = execution_manager.evaluate(selected_nodes)
+        details = ", ".join(f"{item['label']} {item['ms']:.1f} ms" for item in report["executed"][:8])
+        ui_queue.set_value("status_text",
+                           f"Status: evaluated {len(report['executed'])} nodes, reused {report['reused']} "
+                           f"in {report['total_ms']:.1f} ms" + (f" ({details})" if details else ""))
+
+    dpg.set_value("status_text", "Status: evaluating...")
+    _evaluate_thread = threading.Thread(target=run, daemon=True)
+    _evaluate_thread.start()
+
+
 # === Связи и удаление нод ===
 
 active_links = []
@@ -106,6 +140,7 @@ def on_delete_key():
             dpg.delete_item(node_id)
 
         execution_manager.unregister_node(node_id)
+        viewport_culler.forget(node_id)
         if node_id in created_nodes:
             unregister_node(node_id)
 
@@ -136,12 +171,7 @@ def _delete_node_links(node_id):
 
 def _cleanup_node_attributes(node_id):
     from nodes.base_node import BaseNode
-    attrs_to_remove = [
-        attr_id for attr_id, (nid, _, _) in BaseNode.attr_id_to_key_map.items()
-        if nid == node_id
-    ]
-    for attr_id in attrs_to_remove:
-        del BaseNode.attr_id_to_key_map[attr_id]
+    BaseNode.attr_id_to_key_map.remove_node(node_id)
 
 
 # === Drag & Drop ===
@@ -208,42 +238,16 @@ def _drop_callback(sender, app_data, user_data):
 # === Палитра нод ===
 
 def _update_palette():
-    query = dpg.get_value("search_input").lower().strip()
-    dpg.delete_item("palette_container", children_only=True)
-
-    for category, nodes in NODE_REGISTRY.items():
-        matching_nodes = [n for n in nodes if query in n.lower()]
-        if query and not matching_nodes:
-            continue
-
-        with dpg.tree_node(label=f" {category}", default_open=True, parent="palette_container") as tree_node_id:
-            for node_name in (matching_nodes if query else nodes):
-                btn = dpg.add_button(
-                    label=f"➕ {node_name}",
-                    width=-1,
-                    parent=tree_node_id
-                )
-                with dpg.drag_payload(parent=btn, drag_data=node_name, payload_type="NODE"):
-                    dpg.add_text(f"Create {node_name} node")
-
-                node_info = nodes[node_name]
-                description = node_info.get("description", f"Description for {node_name} not available.")
-
-                with dpg.theme() as tooltip_theme:
-                    with dpg.theme_component(dpg.mvAll):
-                        dpg.add_theme_color(dpg.mvThemeCol_WindowBg, (50, 50, 50, 255))
-                        dpg.add_theme_color(dpg.mvThemeCol_Text, (150, 0, 0, 255))
-                        dpg.add_theme_style(dpg.mvStyleVar_ItemSpacing, 5, 5)
-
-                with dpg.tooltip(parent=btn):
-                    dpg.add_text(description)
-                    dpg.bind_item_theme(dpg.last_item(), tooltip_theme)
-
-        dpg.add_spacing(count=2, parent="palette_container")
+    """Строит палитру при первом вызове и фильтрует её по строке поиска."""
+    if not palette.built:
+        palette.build(NODE_REGISTRY)
+    palette.filter(dpg.get_value("search_input"))
 
 
 def on_search_change(sender, app_data, user_data):
-    _update_palette()
+    if not palette.built:
+        palette.build(NODE_REGISTRY)
+    palette.filter(app_data)
 
 
 # === Ресайз окна ===
@@ -286,7 +290,7 @@ def create_main_interface():
         # Меню
         with dpg.menu_bar():
             with dpg.menu(label="File"):
-                dpg.add_menu_item(label="Новый", callback=lambda: dpg.delete_item("node_editor", children_only=True), tag="new_file_item")
+                dpg.add_menu_item(label="Новый", callback=lambda: (dpg.delete_item("node_editor", children_only=True), viewport_culler.reset()), tag="new_file_item")
                 dpg.add_menu_item(label="Загрузить", callback=state_manager.load_state, tag="load_file_item")
                 dpg.add_menu_item(label="Сохранить", callback=state_manager.save_state, tag="save_file_item")
                 dpg.add_separator()
@@ -298,6 +302,9 @@ def create_main_interface():
                                   callback=lambda s, a: setattr(state_manager, 'autosave_enabled', a),
                                   check=True)
             dpg.add_button(label="Run", tag="run_button", callback=toggle_run_callback)
+            dpg.add_button(label="Evaluate", tag="evaluate_button", callback=evaluate_selected_callback)
+            with dpg.tooltip("evaluate_button"):
+                dpg.add_text("Compute the selected nodes and their inputs once")
 
         # Вкладки
         with dpg.tab_bar() as tab_bar:
@@ -314,6 +321,8 @@ def create_main_interface():
             no_scrollbar=False
         ):
             dpg.add_text("Status: Stopped", tag="status_text")
+            # Последние записи лога (кольцевой буфер nodes.log)
+            dpg.add_input_text(tag="log_view", multiline=True, readonly=True, width=-1, height=-1)
 
     # 🔁 Привязываем callback'и ПОСЛЕ создания интерфейса (чтобы избежать цикла)
     _bind_callbacks()
@@ -340,15 +349,33 @@ def _bind_callbacks():
         delink_callback=on_link_deleted
     )
 
+    # Поиск по палитре на каждое изменение строки
+    dpg.configure_item("search_input", callback=on_search_change)
+
     # Регистрируем обработчик Delete
     with dpg.handler_registry():
         dpg.add_key_press_handler(dpg.mvKey_Delete, callback=on_delete_key)
 
 
+# === Лог статуса ===
+
+_log_view_version = -1
+
+
+def refresh_log_view(limit=200):
+    """Показывает последние записи лога в status_log, если они изменились."""
+    global _log_view_version
+    if ring_buffer.version == _log_view_version or not dpg.does_item_exist("log_view"):
+        return
+    _log_view_version = ring_buffer.version
+    dpg.set_value("log_view", "\n".join(ring_buffer.lines(limit)))
+
+
 # === Экспорт ===
 
 __all__ = [
     "create_main_interface",
     "center_viewport",
-    "toggle_run_callback"
+    "toggle_run_callback",
+    "refresh_log_view"
 ]
@@ -0,0 +1,90 @@
+# nodes/graph_batch.py
+# Массовое создание нод и связей в редакторе одной транзакцией:
+#
+#     with GraphBatch() as batch:
+#         a = batch.add_node("Add", pos=(0, 0))
+#         b = batch.add_node("Multiply", pos=(250, 0))
+#         batch.add_link(a, "result", b, "a")
+#
+# Внутри блока создаются только виджеты Dear PyGui. Регистрация нод, темы, список
+# связей редактора и пересборка плана ExecutionManager выполняются один раз при выходе,
+# поэтому построение графа из N нод и L связей линейно по N + L.
+
+import logging
+
+import dearpygui.dearpygui as dpg
+
+from .base_node import BaseNode
+from .execution_manager import execution_manager
+from .registry import create_node_instance, register_nodes
+
+log = logging.getLogger(__name__)
+
+
+class GraphBatch:
+    def __init__(self, parent="node_editor", manager=execution_manager):
+        self.parent = parent
+        self.manager = manager
+        self.nodes = []   # созданные ноды (node_id задан)
+        self.links = []   # [(source_attr_id, target_attr_id, link_id)]
+        self._batch = None
+
+    def __enter__(self):
+        self._batch = self.manager.batch()
+        self._batch.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        try:
+            if exc_type is None:
+                self.commit()
+        finally:
+            batch, self._batch = self._batch, None
+            batch.__exit__(exc_type, exc, traceback)
+        return False
+
+    def add_node(self, node, pos=None, **kwargs):
+        """
+        Создаёт ноду по имени в реестре (или принимает готовый экземпляр) и её виджеты.
+        Возвращает экземпляр или None.
+        """
+        instance = node
+        if isinstance(node, str):
+            instance = create_node_instance(node, parent=self.parent, pos=pos, **kwargs)
+            if instance is None:
+                return None
+        if instance.create() is None:
+            log.error("Could not create widgets for node %s", instance.label)
+            return None
+        self.nodes.append(instance)
+        return instance
+
+    def add_link(self, source, source_key, target, target_key):
+        """
+        Связывает выход source_key ноды source со входом target_key ноды target
+        (экземпляры или node_id). Возвращает ID связи или None.
+        """
+        source_node_id = getattr(source, "node_id", source)
+        target_node_id = getattr(target, "node_id", target)
+        source_attr = BaseNode.attr_id_to_key_map.find(source_node_id, "output", source_key)
+        target_attr = BaseNode.attr_id_to_key_map.find(target_node_id, "input", target_key)
+        if source_attr is None or target_attr is None:
+            log.warning("Could not link %s.%s -> %s.%s: attribute not found",
+                        source_node_id, source_key, target_node_id, target_key)
+            return None
+        link_id = dpg.add_node_link(source_attr, target_attr, parent=self.parent)
+        self.links.append((source_attr, target_attr, link_id))
+        return link_id
+
+    def commit(self):
+        """Регистрирует созданные ноды и связи. Вызывается автоматически при выходе из with."""
+        from .factory import active_links
+
+        register_nodes(self.nodes)
+        for instance in self.nodes:
+            self.manager.register_node(instance, instance.node_id)
+        active_links.extend(self.links)
+        self.manager.update_links([(source_attr, target_attr) for source_attr, target_attr, _ in active_links])
+        log.info("Created %d nodes and %d links", len(self.nodes), len(self.links))
+        self.nodes = []
+        self.links = []
@@ -0,0 +1,158 @@
+# nodes/graph_compiler.py
+# Слияние связных цепочек арифметических нод в одну сгенерированную функцию.
+# Нода участвует в слиянии, если она чистая (pure = True) и задаёт fuse_expression —
+# шаблон выражения над своими входами, например "{a} + {b}".
+# Цепочка Add -> Multiply -> Add превращается в
+#
+#     def fused(in_0, in_1, in_2, in_3):
+#         v_0 = (in_0 + in_1)
+#         v_1 = (v_0 * in_2)
+#         v_2 = (v_1 + in_3)
+#         return (v_0, v_1, v_2)
+#
+# и выполняется одним вызовом за такт; результаты записываются в выходы исходных
+# нод, поэтому их виджеты и связи с остальным графом работают как раньше.
+
+import itertools
+import logging
+from collections import defaultdict, deque
+
+log = logging.getLogger(__name__)
+
+_group_ids = itertools.count(1)
+
+
+def _coerce(value):
+    """Списки и кортежи — в массив float (как math_kernels для отдельных нод)."""
+    if isinstance(value, (list, tuple)):
+        import numpy as np
+        return np.asarray(value, dtype=float)
+    return value
+
+
+def is_fusable(node_instance):
+    return node_instance.pure and node_instance.fuse_expression is not None
+
+
+class FusedGroup:
+    """
+    Группа слитых нод. Для ExecutionManager выглядит как одна нода: у неё есть
+    label, dirty и process(), поэтому такт выполняет её без особых случаев.
+    """
+
+    compute_function = None
+    pure = False
+
+    def __init__(self, members, inputs, function, source):
+        self.node_id = f"fused-{next(_group_ids)}"
+        self.members = members    # ноды в топологическом порядке
+        self.inputs = inputs      # [(node_instance, key)] — внешние входы функции по порядку
+        self.function = function
+        self.source = source      # сгенерированный код (для отладки)
+        self.label = "Fused[" + ", ".join(node.label for node in members) + "]"
+
+    @property
+    def dirty(self):
+        return any(node.dirty for node in self.members)
+
+    @dirty.setter
+    def dirty(self, value):
+        for node in self.members:
+            node.dirty = value
+
+    def process(self):
+        args = [node.get_input_value(key) for node, key in self.inputs]
+        if any(value is None for value in args):
+            # Неполные входы: каждая нода обрабатывает их сама, как без слияния
+            for node in self.members:
+                node.process()
+        else:
+            results = self.function(*map(_coerce, args))
+            for node, value in zip(self.members, results):
+                node.set_output_value(node.fuse_output, value)
+        # Передача результатов внутри группы пометила её ноды грязными — они уже посчитаны
+        self.dirty = False
+
+
+def _is_convex(members, successors):
+    """Нет пути, который выходит из группы и возвращается в неё через другие ноды."""
+    queue = deque(target for node_id in members for target in successors[node_id] if target not in members)
+    seen = set(queue)
+    while queue:
+        node_id = queue.popleft()
+        for target in successors[node_id]:
+            if target in members:
+                return False
+            if target not in seen:
+                seen.add(target)
+                queue.append(target)
+    return True
+
+
+def _generate(member_ids, node_instances, links_into):
+    """Генерирует код функции группы. Возвращает (source, inputs)."""
+    variables = {}   # {node_id: имя переменной результата}
+    inputs = []
+    lines = []
+    for index, node_id in enumerate(member_ids):
+        node = node_instances[node_id]
+        operands = {}
+        for key in node.compute_inputs:
+            source = links_into.get((node_id, key))
+            if source is not None and source[0] in variables \
+                    and source[1] == node_instances[source[0]].fuse_output:
+                operands[key] = variables[source[0]]
+            else:
+                operands[key] = f"in_{len(inputs)}"
+                inputs.append((node, key))
+        variables[node_id] = f"v_{index}"
+        lines.append(f"    v_{index} = ({node.fuse_expression.format(**operands)})")
+    params = ", ".join(f"in_{i}" for i in range(len(inputs)))
+    results = ", ".join(variables[node_id] for node_id in member_ids)
+    source = f"def fused({params}):\n" + "\n".join(lines) + f"\n    return ({results},)\n"
+    return source, inputs
+
+
+def build_fused_groups(node_instances, links, order):
+    """
+    Находит связные подграфы из сливаемых нод (не меньше двух нод) и компилирует их.
+    order: топологический порядок node_id. Возвращает список FusedGroup.
+    """
+    successors = defaultdict(set)
+    links_into = {}
+    parent = {node_id: node_id for node_id in order if is_fusable(node_instances[node_id])}
+
+    def find(node_id):
+        while parent[node_id] != node_id:
+            parent[node_id] = parent[parent[node_id]]
+            node_id = parent[node_id]
+        return node_id
+
+    for source_node_id, source_key, target_node_id, target_key in links:
+        if source_node_id not in node_instances or target_node_id not in node_instances:
+            continue
+        successors[source_node_id].add(target_node_id)
+        links_into[(target_node_id, target_key)] = (source_node_id, source_key)
+        if source_node_id in parent and target_node_id in parent:
+            parent[find(source_node_id)] = find(target_node_id)
+
+    components = defaultdict(list)
+    for node_id in order:
+        if node_id in parent:
+            components[find(node_id)].append(node_id)
+
+    groups = []
+    for member_ids in components.values():
+        if len(member_ids) < 2:
+            continue
+        if not _is_convex(set(member_ids), successors):
+            log.debug("Skipped fusing %s: the chain leaves and re-enters through other nodes", member_ids)
+            continue
+        source, inputs = _generate(member_ids, node_instances, links_into)
+        namespace = {}
+        exec(compile(source, f"<fused {member_ids}>", "exec"), namespace)
+        group = FusedGroup([node_instances[node_id] for node_id in member_ids],
+                           inputs, namespace["fused"], source)
+        groups.append(group)
+        log.debug("Fused %s:\n%s", group.label, source)
+    return groups
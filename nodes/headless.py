@@ -0,0 +1,196 @@
+# nodes/headless.py
+# Выполнение графа без Dear PyGui: контекст DPG не создаётся, create() у нод не вызывается.
+# Запуск из командной строки:
+#   python -m nodes.headless saved_states/state_123.json --ticks 10 --output result.json
+
+import argparse
+import itertools
+import json
+import logging
+from contextlib import contextmanager
+
+from .dpg_stub import ensure_dearpygui
+
+# Dear PyGui для headless-режима не нужен: без него модули нод импортируются с заглушкой
+ensure_dearpygui()
+
+from .execution_manager import ExecutionManager
+from .base_node import BaseNode
+from .log import configure_logging
+
+log = logging.getLogger("nodes.headless")
+
+
+class HeadlessEngine:
+    """
+    Граф нод, исполняемый чистым Python. Значения ручных входов хранятся в
+    node.widget_values, результаты — в node.state["outputs"]. UI (или любой другой
+    код) может подписаться на такты через add_listener() как необязательный наблюдатель.
+    """
+
+    def __init__(self):
+        self.execution_manager = ExecutionManager()
+        self.nodes = {}   # {node_id: node_instance}
+        self.links = []   # [(source_node_id, source_key, target_node_id, target_key)]
+        self.listeners = []
+        self._ids = itertools.count(1)
+        self._batch_depth = 0
+
+    # --- Построение графа ---
+    def add_node(self, node_instance, node_id=None):
+        """Добавляет ноду в граф. Возвращает её ID."""
+        if node_id is None:
+            node_id = next(self._ids)
+            while node_id in self.nodes:
+                node_id = next(self._ids)
+        node_instance.headless = True
+        node_instance.node_id = node_id
+        self.nodes[node_id] = node_instance
+        self.execution_manager.register_node(node_instance, node_id)
+        return node_id
+
+    def remove_node(self, node_id):
+        self.nodes.pop(node_id, None)
+        self.links = [link for link in self.links if link[0] != node_id and link[2] != node_id]
+        self.execution_manager.unregister_node(node_id)
+        self.execution_manager.set_logical_links(self.links)
+
+    def connect(self, source_node_id, source_key, target_node_id, target_key):
+        """Связывает выход source_key одной ноды со входом target_key другой."""
+        self.links.append((source_node_id, source_key, target_node_id, target_key))
+        if not self._batch_depth:
+            self.execution_manager.set_logical_links(self.links)
+
+    @contextmanager
+    def batch(self):
+        """
+        Массовое построение графа: add_node() и connect() внутри блока не пересобирают
+        план — связи передаются и план компилируется один раз при выходе.
+        """
+        self._batch_depth += 1
+        try:
+            with self.execution_manager.batch():
+                yield self
+                if self._batch_depth == 1:
+                    self.execution_manager.set_logical_links(self.links)
+        finally:
+            self._batch_depth -= 1
+
+    def set_input(self, node_id, key, value):
+        """Задаёт значение ручного входа ноды (аналог ввода в виджет)."""
+        self.nodes[node_id].set_widget_value(key, value)
+
+    def load_state(self, state):
+        """
+        Загружает граф из сохранённого StateManager состояния.
+        state: путь к JSON-файлу или уже прочитанный словарь.
+        """
+        from .registry import create_node_instance
+
+        if isinstance(state, str):
+            with open(state, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+
+        with self.batch():
+            self._load_graph(state, create_node_instance)
+        return self
+
+    def _load_graph(self, state, create_node_instance):
+        for node_data in state.get("nodes", []):
+            node_type = node_data.get("label")
+            node = create_node_instance(node_type, parent=None, pos=node_data.get("pos"))
+            if not node:
+                log.warning("Skipped node of unknown type '%s'", node_type)
+                continue
+            node.headless = True
+            # Часть нод переопределяет from_dict как classmethod с обращениями к UI,
+            # поэтому восстанавливаем общую часть состояния базовой реализацией
+            BaseNode.from_dict(node, node_data)
+            self.add_node(node, node_data.get("id"))
+
+        for link_data in state.get("links", []):
+            source_node_id = link_data.get("source_node_id")
+            target_node_id = link_data.get("target_node_id")
+            if source_node_id not in self.nodes or target_node_id not in self.nodes:
+                log.warning("Skipped link with unknown endpoints: %s", link_data)
+                continue
+            self.links.append((source_node_id, link_data.get("source_key"),
+                               target_node_id, link_data.get("target_key")))
+
+    # --- Наблюдатели ---
+    def add_listener(self, callback):
+        """callback(engine, executed) вызывается после каждого такта."""
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    # --- Выполнение ---
+    def tick(self):
+        """Выполняет один такт. Возвращает число выполненных нод."""
+        executed = self.execution_manager.run_once()
+        for callback in list(self.listeners):
+            callback(self, executed)
+        return executed
+
+    def run(self, max_ticks=None):
+        """
+        Выполняет такты, пока граф не успокоится (такт без выполненных нод)
+        или не пройдёт max_ticks тактов. Возвращает число выполненных тактов.
+        """
+        ticks = 0
+        while max_ticks is None or ticks < max_ticks:
+            executed = self.tick()
+            ticks += 1
+            if not executed:
+                # Граф успокоился, только если в фоне не осталось выполняющихся нод
+                if not self.execution_manager.pending_background:
+                    break
+                self.execution_manager.wait_for_background()
+        return ticks
+
+    def evaluate(self, *node_ids):
+        """Считает только указанные ноды и их предков (см. ExecutionManager.evaluate). Возвращает отчёт."""
+        return self.execution_manager.evaluate(node_ids)
+
+    def start(self, speed=None):
+        """Запускает непрерывное выполнение в фоновом потоке (как кнопка Run)."""
+        if speed is not None:
+            self.execution_manager.set_execution_speed(speed)
+        self.execution_manager.start_execution()
+
+    def stop(self):
+        self.execution_manager.stop_execution()
+
+    def outputs(self):
+        """Текущие выходы всех нод: {node_id: {key: value}}."""
+        return {node_id: dict(node.state["outputs"]) for node_id, node in self.nodes.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a saved node graph without Dear PyGui")
+    parser.add_argument("state", help="Path to a state JSON saved by the editor")
+    parser.add_argument("--ticks", type=int, default=None,
+                        help="Maximum number of ticks (default: run until the graph settles)")
+    parser.add_argument("--output", default=None, help="Write node outputs to this JSON file")
+    parser.add_argument("--log-level", default="WARNING", help="Logging level (DEBUG, INFO, WARNING, ERROR)")
+    args = parser.parse_args(argv)
+    configure_logging(args.log_level.upper())
+
+    engine = HeadlessEngine().load_state(args.state)
+    ticks = engine.run(max_ticks=args.ticks)
+    result = {
+        "ticks": ticks,
+        "outputs": {str(node_id): outputs for node_id, outputs in engine.outputs().items()},
+    }
+    text = json.dumps(result, indent=2, ensure_ascii=False, default=str)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,17 @@
 # nodes/llm_chat_manager.py
 
+import threading
+
 import dearpygui.dearpygui as dpg
 
+from nodes.ui_queue import ui_queue
+
 
 class LLMChatManager:
     def __init__(self):
         self.messages = []  # [(role, text), ...], role: "user" | "assistant"
+        self._entries = []  # отформатированный текст каждого сообщения для поля чата
+        self._lock = threading.Lock()
         self.chat_field_id = None
         self.user_input_id = None
         self.user_input_tag = None
@@ -30,33 +36,57 @@ class LLMChatManager:
             return dpg.get_value(self.system_input_tag)
         return "You are a helpful assistant."
 
+    @staticmethod
+    def _format(role, text):
+        prefix = "👤 You: " if role == "user" else "🤖 Assistant: "
+        return f"{prefix}{text}\n{'─' * 40}\n"
+
+    def _render(self):
+        """Обновляет поле чата (из любого потока — через ui_queue, раз в кадр)."""
+        if self.chat_field_id is not None:
+            ui_queue.set_value(self.chat_field_id, "".join(self._entries))
+
     def add_message(self, role: str, text: str):
         """Добавляет сообщение в историю и обновляет UI"""
         if not text:
             return
 
-        self.messages.append((role, text))
-
-        # Обновляем чат-поле
-        if self.chat_field_id and dpg.does_item_exist(self.chat_field_id):
-            current = dpg.get_value(self.chat_field_id)
-            prefix = "👤 You: " if role == "user" else "🤖 Assistant: "
-            new_entry = f"{prefix}{text}\n{'─' * 40}\n"
-            dpg.set_value(self.chat_field_id, current + new_entry)
+        with self._lock:
+            self.messages.append((role, text))
+            self._entries.append(self._format(role, text))
+            self._render()
 
     def add_response(self, text: str):
         """Добавляет ответ нейросети"""
         self.add_message("assistant", text)
 
+    def begin_response(self):
+        """Начинает ответ, который будет дописываться по мере генерации. Возвращает его индекс."""
+        with self._lock:
+            self.messages.append(("assistant", ""))
+            self._entries.append(self._format("assistant", ""))
+            self._render()
+            return len(self.messages) - 1
+
+    def update_response(self, index: int, text: str):
+        """Заменяет текст ответа index (переформатируется только это сообщение)."""
+        with self._lock:
+            if index >= len(self.messages) or self.messages[index][1] == text:
+                return
+            self.messages[index] = ("assistant", text)
+            self._entries[index] = self._format("assistant", text)
+            self._render()
+
     def clear_chat(self):
         """Очищает чат"""
-        self.messages.clear()
-        if self.chat_field_id and dpg.does_item_exist(self.chat_field_id):
-            dpg.set_value(self.chat_field_id, "")
+        with self._lock:
+            self.messages.clear()
+            self._entries.clear()
+            self._render()
 
     def get_context(self) -> list:
         """Возвращает историю в формате для LLM (list of dicts)"""
-        return [{"role": role, "content": text} for role, text in self.messages]
+        return [{"role": role, "content": text} for role, text in self.messages if text]
 
 
 # Глобальный экземпляр
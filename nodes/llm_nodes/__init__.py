@@ -1,11 +1,23 @@
-from .llama_node import LLaMANode
-from .output_node import LLMOutputNode
-from .user_input_prompt import UserInputPromptNode
-from .system_prompt import SystemPromptNode
+# Классы импортируются при первом обращении: nodes.llm_nodes.LLaMANode загружает
+# llama_cpp, а импорт лёгких модулей пакета (output_node, ...) не должен этого делать
+import importlib
+
+_EXPORTS = {
+    "LLaMANode": ".llama_node",
+    "LLMOutputNode": ".output_node",
+    "UserInputPromptNode": ".user_input_prompt",
+    "SystemPromptNode": ".system_prompt",
+}
 
 __all__ = [
     "LLaMANode",
     "LLMOutputNode",
     "UserInputPromptNode",
     "SystemPromptNode"
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,13 +1,18 @@
 from ..base_node import BaseNode
 import dearpygui.dearpygui as dpg
 from llama_cpp import Llama
+import logging
 import threading
 import time
 import json
 import os
-import numpy as np
+
+log = logging.getLogger(__name__)
 
 class LLaMANode(BaseNode):
+    # Поле результата — основное место чтения ответа, не обрезаем
+    preview_chars = None
+
     def __init__(self, parent="node_editor", pos=None):
         super().__init__("LLaMA", parent, pos)
         self.llm = None
@@ -66,6 +71,11 @@ class LLaMANode(BaseNode):
             dpg.add_text("Result:")
             self.outputs["result"] = dpg.add_input_text(label="##result", multiline=True, readonly=True, height=100, width=350)
             self._register_attr(attr_id_output, "output", "result")
+
+        # Потоковый выход: токены уходят получателям по мере генерации (см. streams.py)
+        with dpg.node_attribute(attribute_type=dpg.mvNode_Attr_Output) as attr_id_stream:
+            dpg.add_text("Stream:")
+            self._register_attr(attr_id_stream, "output", "stream")
         
         with dpg.node_attribute(attribute_type=dpg.mvNode_Attr_Static):
             self.status_text = dpg.add_text("Status: Model not loaded")
@@ -84,8 +94,8 @@ class LLaMANode(BaseNode):
     def model_selected(self, sender, app_data):
         """Обработка выбора модели"""
         self.model_path = app_data["file_path_name"]
-        dpg.set_value(self.status_text, f"Status: Loading model...")
-        dpg.configure_item(self.progress_bar, show=True)
+        self._ui_set(self.status_text, f"Status: Loading model...")
+        self._ui_configure(self.progress_bar, show=True)
         
         # Загрузка в фоновом потоке
         threading.Thread(target=self.load_model_background, daemon=True).start()
@@ -96,7 +106,7 @@ class LLaMANode(BaseNode):
 
                 for i in range(1, 101):
                     time.sleep(0.05)
-                    dpg.configure_item(self.progress_bar, default_value=i/100)
+                    self._ui_configure(self.progress_bar, default_value=i/100)
 
                 # 🔥 Добавляем явный чат-тюнинг
                 chat_template = """{{ bos_token }}
@@ -121,12 +131,12 @@ class LLaMANode(BaseNode):
                     # chat_template=chat_template
                 )
 
-                dpg.set_value(self.status_text, f"Status: Model loaded: {os.path.basename(self.model_path)}")
+                self._ui_set(self.status_text, f"Status: Model loaded: {os.path.basename(self.model_path)}")
                 print(f"✅ Модель успешно загружена: {self.model_path}")
 
             except Exception as e:
                 error_msg = f"Status: Error loading model: {str(e)}"
-                dpg.set_value(self.status_text, error_msg)
+                self._ui_set(self.status_text, error_msg)
                 print(f"❌ Ошибка загрузки модели: {e}")
 
     
@@ -138,7 +148,7 @@ class LLaMANode(BaseNode):
     def start_generation(self):
         """Начать генерацию в фоновом потоке"""
         if not self.llm:
-            dpg.set_value(self.status_text, "Status: Model not loaded. Please load a model first.")
+            self._ui_set(self.status_text, "Status: Model not loaded. Please load a model first.")
             return
         
         prompt = self.get_input_value("prompt")
@@ -146,17 +156,19 @@ class LLaMANode(BaseNode):
             prompt = "Hello!"
         
         self.last_prompt = prompt
-        dpg.set_value(self.status_text, "Status: Generating...")
-        dpg.configure_item(self.progress_bar, show=True)
+        self._ui_set(self.status_text, "Status: Generating...")
+        self._ui_configure(self.progress_bar, show=True)
         
         threading.Thread(target=self.generate_background, args=(prompt,), daemon=True).start()
     
     def generate_background(self, prompt):
         """Генерация в фоновом потоке с разделением на System и User промпты"""
+        token_stream = self.open_stream("stream")
+        error = None
         try:
             self.is_generating = True
-            dpg.set_value(self.outputs["result"], "")
-            dpg.configure_item(self.progress_bar, show=True, default_value=0.05)
+            self._ui_set(self.outputs["result"], "")
+            self._ui_configure(self.progress_bar, show=True, default_value=0.05)
             
             # Получаем системный промпт (предположим, у вас есть такой вход в ноде)
             # Если входа нет, можно задать значение по умолчанию
@@ -183,31 +195,39 @@ class LLaMANode(BaseNode):
                     if "content" in chunk["choices"][0]["delta"]:
                         token = chunk["choices"][0]["delta"]["content"]
                         full_text += token
+                        token_stream.write(token)
                         
-                        # Обновляем DearPyGui в реальном времени
-                        dpg.set_value(self.outputs["result"], full_text)
+                        # Обновляем DearPyGui в реальном времени (через ui_queue: за кадр
+                        # применяется только последний текст)
+                        self._ui_set(self.outputs["result"], full_text)
                         
                         # Небольшой визуальный прогресс
                         progress = min(0.95, 0.05 + (len(full_text) / self.parameters["max_tokens"]))
-                        dpg.set_value(self.progress_bar, progress)
+                        self._ui_set(self.progress_bar, progress)
 
                 self.last_output = full_text
             
-            dpg.set_value(self.status_text, "Status: Generation complete")
+            self._ui_set(self.status_text, "Status: Generation complete")
             
         except Exception as e:
+            error = str(e)
             error_msg = f"Status: Error: {str(e)}"
-            dpg.set_value(self.status_text, error_msg)
-            dpg.set_value(self.outputs["result"], f"Error: {str(e)}")
+            self._ui_set(self.status_text, error_msg)
+            self._ui_set(self.outputs["result"], f"Error: {str(e)}")
             print(f"❌ Ошибка: {e}")
         finally:
             self.is_generating = False
-            dpg.configure_item(self.progress_bar, show=False)
+            token_stream.close(error)
+            self._ui_configure(self.progress_bar, show=False)
+            # Новый результат — нода должна передать его дальше по графу
+            self.mark_dirty("llm")
 
     
     def process(self):
         """Обработка ноды - вызывается менеджером выполнения"""
-        print(f"LLaMANode {self.label} processing")
+        log.debug("LLaMANode %s processing", self.label)
+        if self.last_output:
+            self.set_output_value("result", self.last_output)
         return self.last_output
     
     def to_dict(self):
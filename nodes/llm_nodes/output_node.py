@@ -1,12 +1,19 @@
 # nodes/llm_nodes/output_node.py
 import dearpygui.dearpygui as dpg
 from ..base_node import BaseNode
+from ..streams import TokenStream
 
 
 class LLMOutputNode(BaseNode):
+    # Ответ появляется в чате по мере генерации, если вход связан с потоковым выходом LLaMA
+    accepts_streams = True
+
     def __init__(self, parent="node_editor", pos=None):
         super().__init__("LLM Output", parent, pos)
         self.output_field = None  # ссылка на UI-элемент чата
+        self.status = None
+        self._stream = None          # поток, который сейчас дописывается в чат
+        self._stream_message = None  # индекс его сообщения в llm_chat_manager
 
     def _create_inputs(self):
         with dpg.node_attribute(attribute_type=dpg.mvNode_Attr_Input) as attr_id:
@@ -27,6 +34,8 @@ class LLMOutputNode(BaseNode):
 
     def process(self):
         text = self.get_input_value("text")
+        if isinstance(text, TokenStream):
+            return self._process_stream(text)
         if not text:
             return ""
 
@@ -34,7 +43,24 @@ class LLMOutputNode(BaseNode):
         from nodes.llm_chat_manager import llm_chat_manager
         llm_chat_manager.add_response(text)
 
-        dpg.set_value(self.status, "✅ Added to chat")
+        self._ui_set(self.status, "✅ Added to chat")
+        return text
+
+    def _process_stream(self, stream):
+        """Дописывает в чат текст, пришедший в поток с прошлого вызова."""
+        from nodes.llm_chat_manager import llm_chat_manager
+        if stream is not self._stream:
+            # Новая генерация — новое сообщение в чате
+            self._stream = stream
+            self._stream_message = llm_chat_manager.begin_response()
+        text = stream.text
+        llm_chat_manager.update_response(self._stream_message, text)
+        if stream.error:
+            self._ui_set(self.status, f"❌ {stream.error}")
+        elif stream.closed:
+            self._ui_set(self.status, "✅ Added to chat")
+        else:
+            self._ui_set(self.status, f"… Streaming ({len(text)} chars)")
         return text
 
     def set_output_field(self, field_id):
@@ -0,0 +1,99 @@
+# nodes/log.py
+# Логирование подсистем через стандартный logging.
+# Логгеры называются по модулям (logging.getLogger(__name__)), поэтому уровень можно
+# задать как для всего приложения ("nodes"), так и для отдельной подсистемы
+# ("nodes.execution_manager", "nodes.llm_nodes", ...).
+# Сообщения в горячих путях пишутся на уровне DEBUG с ленивым форматированием
+# ("%s"-аргументы), так что при выключенном DEBUG они не форматируются.
+
+import logging
+import threading
+from collections import deque
+
+ROOT_LOGGER = "nodes"
+
+# Подсистемы, уровни которых можно менять из UI
+SUBSYSTEMS = (
+    "nodes",
+    "nodes.base_node",
+    "nodes.execution_manager",
+    "nodes.math_nodes",
+    "nodes.llm_nodes",
+    "nodes.vector_db",
+    "nodes.profiler",
+    "nodes.registry",
+    "nodes.ui_queue",
+    "nodes.headless",
+    "nodes.trace",
+)
+
+LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+
+LOG_FORMAT = "%(asctime)s %(levelname)-7s [%(name)s] %(message)s"
+
+
+class RingBufferHandler(logging.Handler):
+    """Хранит последние capacity отформатированных записей в памяти (для лога статуса в UI)."""
+
+    def __init__(self, capacity=500):
+        super().__init__()
+        self.records = deque(maxlen=capacity)
+        self.version = 0  # увеличивается с каждой записью — UI перерисовывает лог только при изменении
+        self._buffer_lock = threading.Lock()
+
+    def emit(self, record):
+        try:
+            line = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        with self._buffer_lock:
+            self.records.append(line)
+            self.version += 1
+
+    def lines(self, limit=None):
+        with self._buffer_lock:
+            records = list(self.records)
+        return records[-limit:] if limit else records
+
+    def clear(self):
+        with self._buffer_lock:
+            self.records.clear()
+            self.version += 1
+
+
+ring_buffer = RingBufferHandler()
+ring_buffer.setFormatter(logging.Formatter(LOG_FORMAT, datefmt="%H:%M:%S"))
+
+_console_handler = None
+
+
+def configure_logging(level="INFO", console=True, levels=None):
+    """
+    Настраивает логгер "nodes": кольцевой буфер для UI и (опционально) вывод в консоль.
+    levels: {имя подсистемы: уровень} — переопределения для отдельных подсистем.
+    """
+    global _console_handler
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(level)
+    root.propagate = False
+    if ring_buffer not in root.handlers:
+        root.addHandler(ring_buffer)
+    if console and _console_handler is None:
+        _console_handler = logging.StreamHandler()
+        _console_handler.setFormatter(logging.Formatter(LOG_FORMAT, datefmt="%H:%M:%S"))
+        root.addHandler(_console_handler)
+    elif not console and _console_handler is not None:
+        root.removeHandler(_console_handler)
+        _console_handler = None
+    for name, subsystem_level in (levels or {}).items():
+        set_level(name, subsystem_level)
+
+
+def set_level(subsystem, level):
+    """Задаёт уровень логирования подсистемы ("nodes.execution_manager", "DEBUG")."""
+    logging.getLogger(subsystem).setLevel(level)
+
+
+def get_level(subsystem):
+    return logging.getLevelName(logging.getLogger(subsystem).getEffectiveLevel())
@@ -21,5 +21,5 @@ class If_statement_node(BaseNode):
         a = dpg.get_value(self.inputs["a"])
         b = dpg.get_value(self.inputs["b"])
         result = a + b
-        dpg.set_value(self.outputs["result"], f"{result:.2f}")
+        self._ui_set(self.outputs["result"], f"{result:.2f}")
         return result
\ No newline at end of file
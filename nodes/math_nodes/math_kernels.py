@@ -0,0 +1,32 @@
+# nodes/math_nodes/math_kernels.py
+# Чистые функции вычисления математических нод.
+# Модуль не импортирует Dear PyGui: функции выполняются в дочерних процессах
+# ProcessPoolExecutor и должны сериализоваться pickle по имени модуля.
+#
+# Входы могут быть числами или массивами numpy (порты-массивы). Операции
+# поэлементные и следуют правилам broadcasting NumPy:
+#   - число и массив: число применяется к каждому элементу;
+#   - массивы одинаковой формы: поэлементно;
+#   - массивы разной формы: формы сравниваются с последней оси, оси длины 1
+#     растягиваются ((3, 1) + (4,) -> (3, 4)); несовместимые формы дают ValueError,
+#     который попадает в лог как ошибка ноды.
+# Списки и кортежи (например, JSON-вектор из другой ноды) приводятся к массиву
+# float, иначе "+" склеил бы списки вместо сложения.
+
+import numpy as np
+
+
+def _operand(value):
+    if isinstance(value, (list, tuple)):
+        return np.asarray(value, dtype=float)
+    return value
+
+
+def add(a, b):
+    """Сложение: {"result": a + b}"""
+    return {"result": _operand(a) + _operand(b)}
+
+
+def multiply(a, b):
+    """Умножение: {"result": a * b}"""
+    return {"result": _operand(a) * _operand(b)}
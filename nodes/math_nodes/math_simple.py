@@ -1,8 +1,17 @@
 # nodes/math_nodes/math_simple.py
+import logging
 from ..base_node import BaseNode
+from . import math_kernels
 import dearpygui.dearpygui as dpg
 
+log = logging.getLogger(__name__)
+
 class AddNode(BaseNode):
+    compute_function = staticmethod(math_kernels.add)
+    compute_inputs = ("a", "b")
+    pure = True
+    fuse_expression = "{a} + {b}"
+
     def __init__(self, parent="node_editor", pos=None):
         super().__init__("Add", parent, pos)
 
@@ -23,16 +32,21 @@ class AddNode(BaseNode):
     def process(self):
         a = self.get_input_value("a")
         b = self.get_input_value("b")
-        print(f"AddNode {self.label} processing: {a} + {b}")
+        log.debug("AddNode %s processing: %r + %r", self.label, a, b)
         if a is not None and b is not None:
-            result = a + b
+            result = math_kernels.add(a, b)["result"]
             self.set_output_value("result", result)
             return result
         else:
-            print(f"AddNode {self.label}: Input values are None, cannot compute.")
+            log.debug("AddNode %s: Input values are None, cannot compute.", self.label)
             return 0.0
     
 class MultiplyNode(BaseNode):
+    compute_function = staticmethod(math_kernels.multiply)
+    compute_inputs = ("a", "b")
+    pure = True
+    fuse_expression = "{a} * {b}"
+
     def __init__(self, parent="node_editor", pos=None):
         super().__init__("Multiply", parent, pos)
 
@@ -58,11 +72,11 @@ class MultiplyNode(BaseNode):
     def process(self):
         a = self.get_input_value("a")
         b = self.get_input_value("b")
-        print(f"MultiplyNode {self.label} processing: {a} * {b}")
+        log.debug("MultiplyNode %s processing: %r * %r", self.label, a, b)
         if a is not None and b is not None:
-            result = a * b
+            result = math_kernels.multiply(a, b)["result"]
             self.set_output_value("result", result)
             return result
         else:
-            print(f"MultiplyNode {self.label}: Input values are None, cannot compute.")
+            log.debug("MultiplyNode %s: Input values are None, cannot compute.", self.label)
             return 0.0 # Возвращаем 0.0 или None, если входы не определены
\ No newline at end of file
@@ -0,0 +1,175 @@
+# nodes/memo.py
+# Memo-кэш для чистых нод (BaseNode.pure = True): результат process() запоминается
+# по стабильному хешу класса ноды, разрешённых входов и параметров.
+# Кэш ограничен и числом записей, и примерным объёмом выходов в байтах; ноды с большими
+# массивами на входе не кэшируются: хеширование мегабайтов стоит дороже, чем сложение.
+
+import hashlib
+import logging
+import struct
+import threading
+from collections import OrderedDict
+
+log = logging.getLogger(__name__)
+
+
+def _update(digest, value):
+    """Дописывает в digest каноническое представление value."""
+    if value is None:
+        digest.update(b"N")
+    elif isinstance(value, bool):
+        digest.update(b"B1" if value else b"B0")
+    elif isinstance(value, int):
+        digest.update(b"I%d;" % value)
+    elif isinstance(value, float):
+        digest.update(b"F" + struct.pack("<d", value))
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        digest.update(b"S%d;" % len(data) + data)
+    elif isinstance(value, (bytes, bytearray)):
+        digest.update(b"Y%d;" % len(value) + bytes(value))
+    elif isinstance(value, (list, tuple)):
+        digest.update(b"L%d;" % len(value) if isinstance(value, list) else b"T%d;" % len(value))
+        for item in value:
+            _update(digest, item)
+    elif isinstance(value, dict):
+        # Порядок ключей не влияет на хеш
+        digest.update(b"D%d;" % len(value))
+        for key_hash, item in sorted((stable_hash(key), item) for key, item in value.items()):
+            digest.update(key_hash.encode("ascii"))
+            _update(digest, item)
+    elif isinstance(value, (set, frozenset)):
+        digest.update(b"E%d;" % len(value))
+        for item_hash in sorted(stable_hash(item) for item in value):
+            digest.update(item_hash.encode("ascii"))
+    elif hasattr(value, "tobytes") and hasattr(value, "dtype") and hasattr(value, "shape"):
+        # Массивы (numpy и совместимые): тип, форма и содержимое
+        digest.update(f"A{value.dtype}{tuple(value.shape)};".encode("ascii"))
+        digest.update(value.tobytes())
+    else:
+        raise TypeError(f"Cannot hash value of type {type(value).__name__}")
+
+
+def value_nbytes(value):
+    """Примерный объём значения в байтах (массивы — nbytes, коллекции — сумма элементов)."""
+    if hasattr(value, "nbytes") and hasattr(value, "dtype"):
+        return int(value.nbytes)
+    if isinstance(value, (str, bytes, bytearray)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(value_nbytes(key) + value_nbytes(item) for key, item in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return 8 * len(value) + sum(value_nbytes(item) for item in value)
+    return 8
+
+
+def _largest_array(values):
+    """nbytes самого большого массива среди values и вложенных списков/кортежей/словарей."""
+    largest = 0
+    for value in values:
+        if hasattr(value, "nbytes") and hasattr(value, "dtype"):
+            largest = max(largest, int(value.nbytes))
+        elif isinstance(value, dict):
+            largest = max(largest, _largest_array(value.values()))
+        elif isinstance(value, (list, tuple)):
+            largest = max(largest, _largest_array(value))
+    return largest
+
+
+def stable_hash(value):
+    """
+    Хеш, не зависящий от процесса и PYTHONHASHSEED (в отличие от hash()).
+    Для неподдерживаемых типов бросает TypeError.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    _update(digest, value)
+    return digest.hexdigest()
+
+
+class MemoCache:
+    """
+    LRU-кэш {ключ: выходы ноды} со статистикой попаданий.
+    max_size — предел числа записей, max_bytes — примерного объёма сохранённых выходов;
+    входы с массивом больше max_array_bytes не хешируются и не кэшируются.
+    """
+
+    def __init__(self, max_size=1024, max_bytes=64 * 1024 * 1024, max_array_bytes=64 * 1024):
+        self.enabled = True
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.max_array_bytes = max_array_bytes
+        self._entries = OrderedDict()   # {ключ: (выходы, байты)}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.skipped = 0                # вычисления, не попавшие в кэш из-за размера
+
+    def accepts(self, inputs):
+        """Можно ли кэшировать ноду с такими входами ({key: value}): нет массивов больше max_array_bytes."""
+        if _largest_array(inputs.values()) > self.max_array_bytes:
+            with self._lock:
+                self.skipped += 1
+            return False
+        return True
+
+    def get(self, key):
+        """Возвращает сохранённые выходы или None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, outputs):
+        nbytes = value_nbytes(outputs)
+        with self._lock:
+            if nbytes > self.max_bytes:
+                self.skipped += 1
+                return
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (outputs, nbytes)
+            self._bytes += nbytes
+            self._evict()
+
+    def _evict(self):
+        """Вытесняет самые старые записи, пока кэш не уложится в пределы (под _lock)."""
+        while self._entries and (len(self._entries) > self.max_size or self._bytes > self.max_bytes):
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            self._bytes -= nbytes
+            self.evictions += 1
+
+    def resize(self, max_size=None, max_bytes=None):
+        with self._lock:
+            if max_size is not None:
+                self.max_size = max(1, int(max_size))
+            if max_bytes is not None:
+                self.max_bytes = max(0, int(max_bytes))
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = self.skipped = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "skipped": self.skipped,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,171 @@
+# nodes/palette.py
+# Палитра нод. Виджеты строятся один раз; поиск не пересоздаёт их, а показывает
+# и скрывает уже созданные кнопки по заранее построенному индексу.
+#
+# Ранжирование (каждое слово запроса должно где-то совпасть, очки слов складываются):
+#   имя совпадает целиком          100
+#   имя начинается с запроса        80
+#   слово имени начинается с него   70
+#   подстрока имени                 60
+#   подстрока категории/описания    40
+#   буквы запроса по порядку в имени (нечёткое совпадение)  до 30, меньше за разрывы
+
+import logging
+import time
+
+import dearpygui.dearpygui as dpg
+
+log = logging.getLogger(__name__)
+
+
+class PaletteEntry:
+    __slots__ = ("category", "name", "name_lower", "words", "text_lower", "description")
+
+    def __init__(self, category, name, description):
+        self.category = category
+        self.name = name
+        self.description = description
+        self.name_lower = name.lower()
+        self.words = tuple(self.name_lower.replace("_", " ").split())
+        self.text_lower = f"{category} {description}".lower()
+
+
+def _fuzzy_score(token, text):
+    """Буквы token по порядку в text: 30 минус штраф за разрывы, 0 — нет совпадения."""
+    position = -1
+    gaps = 0
+    for char in token:
+        found = text.find(char, position + 1)
+        if found < 0:
+            return 0
+        if position >= 0:
+            gaps += found - position - 1
+        position = found
+    return max(1, 30 - gaps)
+
+
+def score_entry(entry, tokens):
+    """Очки записи для слов запроса (0 — не подходит)."""
+    total = 0
+    for token in tokens:
+        if entry.name_lower == token:
+            score = 100
+        elif entry.name_lower.startswith(token):
+            score = 80
+        elif any(word.startswith(token) for word in entry.words):
+            score = 70
+        elif token in entry.name_lower:
+            score = 60
+        elif token in entry.text_lower:
+            score = 40
+        else:
+            score = _fuzzy_score(token, entry.name_lower)
+        if not score:
+            return 0
+        total += score
+    return total
+
+
+class PaletteIndex:
+    """Поисковый индекс по именам, категориям и описаниям нод реестра (без Dear PyGui)."""
+
+    def __init__(self, registry):
+        self.entries = [
+            PaletteEntry(category, name, info.get("description", f"Description for {name} not available."))
+            for category, nodes in registry.items()
+            for name, info in nodes.items()
+        ]
+
+    def search(self, query):
+        """Записи, подходящие под запрос, по убыванию очков: [(score, entry)]. Пустой запрос — все записи."""
+        tokens = query.lower().split()
+        if not tokens:
+            return [(0, entry) for entry in self.entries]
+        ranked = [(score_entry(entry, tokens), entry) for entry in self.entries]
+        ranked = [(score, entry) for score, entry in ranked if score]
+        ranked.sort(key=lambda item: -item[0])   # sort устойчивый: при равенстве — порядок реестра
+        return ranked
+
+
+class Palette:
+    """Виджеты палитры: категории (tree_node) с кнопками нод, которые можно перетащить в редактор."""
+
+    def __init__(self, container="palette_container"):
+        self.container = container
+        self.index = None
+        self._buttons = {}      # {(category, name): button_id}
+        self._categories = {}   # {category: (tree_node_id, spacing_id)}
+        self._order = {}        # {category: [name, ...]} — текущий порядок кнопок
+        self._tooltip_theme = None
+        self._query = None
+
+    @property
+    def built(self):
+        return self.index is not None
+
+    def build(self, registry):
+        """Создаёт виджеты палитры (один раз; повторный вызов — после изменения реестра)."""
+        dpg.delete_item(self.container, children_only=True)
+        self._buttons.clear()
+        self._categories.clear()
+        self._order.clear()
+        self.index = PaletteIndex(registry)
+        self._query = None
+
+        if self._tooltip_theme is None:
+            # Одна тема подсказок на все кнопки
+            with dpg.theme() as self._tooltip_theme:
+                with dpg.theme_component(dpg.mvAll):
+                    dpg.add_theme_color(dpg.mvThemeCol_WindowBg, (50, 50, 50, 255))
+                    dpg.add_theme_color(dpg.mvThemeCol_Text, (150, 0, 0, 255))
+                    dpg.add_theme_style(dpg.mvStyleVar_ItemSpacing, 5, 5)
+
+        for entry in self.index.entries:
+            if entry.category not in self._categories:
+                tree_node_id = dpg.add_tree_node(label=f" {entry.category}", default_open=True, parent=self.container)
+                spacing_id = dpg.add_spacer(height=6, parent=self.container)
+                self._categories[entry.category] = (tree_node_id, spacing_id)
+                self._order[entry.category] = []
+            tree_node_id = self._categories[entry.category][0]
+            btn = dpg.add_button(label=f"➕ {entry.name}", width=-1, parent=tree_node_id)
+            with dpg.drag_payload(parent=btn, drag_data=entry.name, payload_type="NODE"):
+                dpg.add_text(f"Create {entry.name} node")
+            with dpg.tooltip(parent=btn) as tooltip_id:
+                dpg.add_text(entry.description)
+            dpg.bind_item_theme(tooltip_id, self._tooltip_theme)
+            self._buttons[(entry.category, entry.name)] = btn
+            self._order[entry.category].append(entry.name)
+        log.debug("Palette built: %d nodes in %d categories", len(self._buttons), len(self._categories))
+
+    def filter(self, query):
+        """Показывает подходящие кнопки в порядке релевантности, остальные скрывает."""
+        query = (query or "").strip()
+        if query == self._query:
+            return
+        started = time.perf_counter()
+        self._query = query
+        ranked = self.index.search(query)
+
+        visible = {}   # {category: [name, ...]} в порядке очков
+        for _, entry in ranked:
+            visible.setdefault(entry.category, []).append(entry.name)
+
+        for category, (tree_node_id, spacing_id) in self._categories.items():
+            names = visible.get(category, [])
+            shown = set(names)
+            for name in self._order[category]:
+                dpg.configure_item(self._buttons[(category, name)], show=name in shown)
+            if names and names != self._order[category][:len(names)]:
+                # Перемещаем подходящие кнопки в начало категории в порядке очков (без пересоздания)
+                first_hidden = [name for name in self._order[category] if name not in shown]
+                for name in names + first_hidden:
+                    dpg.move_item(self._buttons[(category, name)], parent=tree_node_id)
+                self._order[category] = names + first_hidden
+            dpg.configure_item(tree_node_id, show=bool(names))
+            dpg.configure_item(spacing_id, show=bool(names))
+
+        log.debug("Palette filter %r: %d matches in %.2f ms", query, len(ranked),
+                  (time.perf_counter() - started) * 1000.0)
+
+
+palette = Palette()
@@ -0,0 +1,114 @@
+# nodes/preview.py
+# Компактное текстовое представление значений выходов для виджетов нод.
+# Значения выходов хранятся в state["outputs"] как есть; текст для виджета строится
+# лениво: set_output_value() только отмечает выход, а PreviewRenderer в UI-потоке
+# форматирует его, когда значение изменилось и виджет виден на экране.
+
+import logging
+import reprlib
+import threading
+
+import dearpygui.dearpygui as dpg
+
+from .culling import viewport_culler
+
+log = logging.getLogger(__name__)
+
+PREVIEW_ITEMS = 6      # сколько элементов массива/списка показывать
+PREVIEW_CHARS = 2000   # предел длины текста превью по умолчанию
+
+_repr = reprlib.Repr()
+_repr.maxlist = _repr.maxtuple = _repr.maxset = _repr.maxfrozenset = PREVIEW_ITEMS
+_repr.maxdict = PREVIEW_ITEMS
+_repr.maxlevel = 3
+_repr.maxstring = 200
+_repr.maxother = 200
+
+
+def is_array(value):
+    """Массив numpy (или совместимый): проверяем по атрибутам, без импорта numpy."""
+    return hasattr(value, "shape") and hasattr(value, "dtype") and hasattr(value, "ravel")
+
+
+def format_array(value, max_items=PREVIEW_ITEMS):
+    """'array(1000000,) float64 [0, 1, 2, …, 999999]' — форма, тип и несколько значений."""
+    flat = value.ravel()
+    size = flat.shape[0]
+    if size <= max_items:
+        items = [repr(item) for item in flat.tolist()]
+    else:
+        head = flat[:max_items - 1].tolist()
+        items = [repr(item) for item in head] + ["…", repr(flat[size - 1].item())]
+    return f"array{tuple(value.shape)} {value.dtype} [{', '.join(items)}]"
+
+
+def format_value(value, max_chars=PREVIEW_CHARS):
+    """
+    Текст для виджета выхода, не длиннее max_chars (None — без ограничения).
+    Большие коллекции сокращаются до первых элементов без полного str().
+    """
+    if is_array(value):
+        return format_array(value)
+    if isinstance(value, str):
+        text = value
+    elif isinstance(value, (list, tuple, dict, set, frozenset)):
+        text = _repr.repr(value)
+    else:
+        text = str(value)
+    if max_chars is not None and len(text) > max_chars:
+        return f"{text[:max_chars]}… [{len(text)} chars]"
+    return text
+
+
+class PreviewRenderer:
+    """Отложенная отрисовка превью выходов: не чаще раза за кадр и только видимых."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # {(id(node), key): (node, key, seq)} — выходы с неотрисованным значением;
+        # seq отличает отметку, пришедшую во время отрисовки
+        self._pending = {}
+        self._seq = 0
+        self.rendered = 0
+
+    def mark(self, node, key):
+        """Значение выхода изменилось (из любого потока)."""
+        with self._lock:
+            self._seq += 1
+            self._pending[(id(node), key)] = (node, key, self._seq)
+
+    def render(self):
+        """Отрисовывает изменившиеся выходы с видимыми виджетами (только из UI-потока)."""
+        with self._lock:
+            if not self._pending:
+                return 0
+            pending = list(self._pending.items())
+        rendered = 0
+        done = []
+        for pending_key, (node, key, seq) in pending:
+            if viewport_culler.is_culled(node.node_id):
+                # Нода свёрнута вне экрана — без обращений к Dear PyGui
+                continue
+            item = node.outputs.get(key)
+            if item is None or not dpg.does_item_exist(item):
+                done.append((pending_key, seq))
+                continue
+            if not dpg.is_item_visible(item):
+                # Нода за пределами экрана или свёрнута — отрисуем, когда появится
+                continue
+            done.append((pending_key, seq))
+            try:
+                dpg.set_value(item, format_value(node.state["outputs"].get(key), node.preview_chars))
+                rendered += 1
+            except Exception as e:
+                log.warning("Could not render preview of %s.%s: %s", node.label, key, e)
+        with self._lock:
+            for pending_key, seq in done:
+                entry = self._pending.get(pending_key)
+                if entry is not None and entry[2] == seq:
+                    del self._pending[pending_key]
+        self.rendered += rendered
+        return rendered
+
+
+previews = PreviewRenderer()
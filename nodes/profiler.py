@@ -0,0 +1,144 @@
+# nodes/profiler.py
+
+import csv
+import json
+import logging
+import threading
+import time
+from collections import deque
+
+log = logging.getLogger(__name__)
+
+
+class NodeStats:
+    """Накопленная статистика одной ноды."""
+
+    __slots__ = ("node_id", "label", "calls", "errors", "wall_total", "wall_max",
+                 "cpu_total", "propagate_total", "last_wall", "last_cpu")
+
+    def __init__(self, node_id, label):
+        self.node_id = node_id
+        self.label = label
+        self.calls = 0
+        self.errors = 0
+        self.wall_total = 0.0
+        self.wall_max = 0.0
+        self.cpu_total = 0.0
+        self.propagate_total = 0.0
+        self.last_wall = 0.0
+        self.last_cpu = 0.0
+
+    def to_row(self):
+        """Строка для таблицы/экспорта (времена в миллисекундах)."""
+        return {
+            "node_id": self.node_id,
+            "label": self.label,
+            "calls": self.calls,
+            "errors": self.errors,
+            "avg_ms": (self.wall_total / self.calls * 1000.0) if self.calls else 0.0,
+            "max_ms": self.wall_max * 1000.0,
+            "total_ms": self.wall_total * 1000.0,
+            "cpu_ms": self.cpu_total * 1000.0,
+            "propagate_ms": self.propagate_total * 1000.0,
+            "last_ms": self.last_wall * 1000.0,
+        }
+
+
+class NodeProfiler:
+    """
+    Профилировщик выполнения нод: время process() (wall и CPU), число вызовов,
+    число ошибок и время передачи данных потомкам — по каждой ноде и по каждому такту.
+    Пока enabled == False, ExecutionManager не делает никаких замеров.
+    """
+
+    COLUMNS = ("node_id", "label", "calls", "errors", "avg_ms", "max_ms",
+               "total_ms", "cpu_ms", "propagate_ms", "last_ms")
+
+    def __init__(self, history_size=1000):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._stats = {}                                # {node_id: NodeStats}
+        self.ticks = deque(maxlen=history_size)         # последние такты
+        self.tick_count = 0
+        self._current_tick = None
+        self._tick_started = 0.0
+
+    def set_enabled(self, enabled):
+        self.enabled = bool(enabled)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self.ticks.clear()
+            self.tick_count = 0
+            self._current_tick = None
+
+    # --- Запись замеров (вызывается из ExecutionManager) ---
+    def begin_tick(self):
+        with self._lock:
+            self.tick_count += 1
+            self._current_tick = {"tick": self.tick_count, "started": time.time(), "nodes": {}}
+            self._tick_started = time.perf_counter()
+
+    def end_tick(self, executed):
+        with self._lock:
+            tick = self._current_tick
+            if tick is None:
+                return
+            tick["wall_ms"] = (time.perf_counter() - self._tick_started) * 1000.0
+            tick["executed"] = executed
+            self.ticks.append(tick)
+            self._current_tick = None
+
+    def _get_stats(self, node_id, label):
+        stats = self._stats.get(node_id)
+        if stats is None:
+            stats = self._stats[node_id] = NodeStats(node_id, label)
+        return stats
+
+    def record_process(self, node_id, label, wall, cpu, error=False):
+        with self._lock:
+            stats = self._get_stats(node_id, label)
+            stats.calls += 1
+            stats.errors += 1 if error else 0
+            stats.wall_total += wall
+            stats.wall_max = max(stats.wall_max, wall)
+            stats.cpu_total += cpu
+            stats.last_wall = wall
+            stats.last_cpu = cpu
+            if self._current_tick is not None:
+                entry = self._current_tick["nodes"].setdefault(node_id, {})
+                entry.update(wall_ms=wall * 1000.0, cpu_ms=cpu * 1000.0, error=error)
+
+    def record_propagation(self, node_id, label, seconds):
+        with self._lock:
+            self._get_stats(node_id, label).propagate_total += seconds
+            if self._current_tick is not None:
+                entry = self._current_tick["nodes"].setdefault(node_id, {})
+                entry["propagate_ms"] = entry.get("propagate_ms", 0.0) + seconds * 1000.0
+
+    # --- Чтение и экспорт ---
+    def snapshot(self, sort_key="total_ms", descending=True):
+        """Список строк статистики, отсортированный по колонке sort_key."""
+        with self._lock:
+            rows = [stats.to_row() for stats in self._stats.values()]
+        rows.sort(key=lambda row: row[sort_key], reverse=descending)
+        return rows
+
+    def export_csv(self, path):
+        rows = self.snapshot()
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=self.COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+        log.info("Exported %d nodes to %s", len(rows), path)
+        return path
+
+    def export_json(self, path):
+        with self._lock:
+            ticks = list(self.ticks)
+        data = {"nodes": self.snapshot(), "ticks": ticks}
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+        log.info("Exported %d nodes and %d ticks to %s", len(data["nodes"]), len(ticks), path)
+        return path
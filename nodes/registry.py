@@ -1,32 +1,54 @@
+# nodes/registry.py
+# Реестр нод. Ноды описываются путём к классу ("модуль:Класс") и метаданными;
+# модуль ноды импортируется только при создании первого экземпляра, поэтому запуск
+# не загружает llama_cpp, qdrant_client и numpy, пока такие ноды не нужны.
+#
+# Сторонние наборы нод подключаются через entry points группы "node_editor.node_packs".
+# Entry point указывает на словарь (или функцию, возвращающую словарь) того же вида,
+# что NODE_REGISTRY:
+#
+#     [project.entry-points."node_editor.node_packs"]
+#     audio = "audio_nodes.manifest:NODES"
+#
+#     NODES = {"Audio": {"Gain": {"class": "audio_nodes.gain:GainNode",
+#                                 "description": "...", "theme": "math"}}}
+#
+# Модуль манифеста должен быть лёгким (без импорта самих нод). Собранные манифесты
+# кэшируются в файле; кэш действителен, пока не изменился набор установленных пакетов.
+
+import importlib
+import json
+import logging
+import os
+
 import dearpygui.dearpygui as dpg
-from .math_nodes.math_simple import AddNode, MultiplyNode
-from .logic_nodes.logic_simple import If_statement_node
-from .text.Simple import TextViewerNode
-# Добавляем импорт LLaMA ноды
-from .llm_nodes.llama_node import LLaMANode
-from .vector_db.qdrant_nodes import QdrantAddNode, QdrantSearchNode
-from .llm_nodes.output_node import LLMOutputNode
-from .llm_nodes.user_input_prompt import UserInputPromptNode
-from .llm_nodes.system_prompt import SystemPromptNode
 
+log = logging.getLogger(__name__)
+
+NODE_PACKS_GROUP = "node_editor.node_packs"
+NODE_PACKS_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "node_editor", "node_packs.json")
+
+# "class" — путь "модуль:Класс"; "theme" — ключ темы заголовка (см. init_themes)
 NODE_REGISTRY = {
     "Math": {
         "Add": {
-            "class": AddNode,
+            "class": "nodes.math_nodes.math_simple:AddNode",
             "node_store": "REGISTRY",
             "description": "Сложение двух чисел",
-            "category": "Math"
+            "category": "Math",
+            "theme": "math"
         },
         "Multiply": {
-            "class": MultiplyNode,
+            "class": "nodes.math_nodes.math_simple:MultiplyNode",
             "node_store": "REGISTRY",
             "description": "Умножение двух чисел",
-            "category": "Math"
+            "category": "Math",
+            "theme": "math"
         },
     },
     "Logic": {
         "If": {
-            "class": If_statement_node,
+            "class": "nodes.logic_nodes.logic_simple:If_statement_node",
             "node_store": "REGISTRY",
             "description": "Логическое если",
             "category": "Logic"  # ← исправлено: было "Math"
@@ -34,33 +56,36 @@ NODE_REGISTRY = {
     },
     "LLM": {
         "LLaMA": {
-            "class": LLaMANode,
+            "class": "nodes.llm_nodes.llama_node:LLaMANode",
             "node_store": "REGISTRY",
             "description": "LLaMA модель для генерации текста",
-            "category": "LLM"
+            "category": "LLM",
+            "theme": "llm"
         },
         "LLM Output": {
-            "class": LLMOutputNode,
+            "class": "nodes.llm_nodes.output_node:LLMOutputNode",
             "node_store": "REGISTRY",
             "description": "Добавляет текст в чат как ответ нейросети",
             "category": "LLM"
         },
         "User Input Prompt": {
-            "class": UserInputPromptNode,
+            "class": "nodes.llm_nodes.user_input_prompt:UserInputPromptNode",
             "node_store": "REGISTRY",
             "description": "Позволяет пользователю ввести текстовый запрос",
-            "category": "LLM"
+            "category": "LLM",
+            "theme": "llm"
         },
         "System Prompt": {
-            "class": SystemPromptNode,
+            "class": "nodes.llm_nodes.system_prompt:SystemPromptNode",
             "node_store": "REGISTRY",
             "description": "Задает системное сообщение для модели",
-            "category": "LLM"
+            "category": "LLM",
+            "theme": "llm"
         },
     },
     "Text": {
         "Output": {
-            "class": TextViewerNode,
+            "class": "nodes.text.Simple:TextViewerNode",
             "node_store": "REGISTRY",
             "description": "Вывод текста",
             "category": "Text"
@@ -68,20 +93,148 @@ NODE_REGISTRY = {
     },
     "Vector DB": {
         "Qdrant Add": {
-            "class": QdrantAddNode,
+            "class": "nodes.vector_db.qdrant_nodes:QdrantAddNode",
             "node_store": "REGISTRY",
             "description": "Добавление векторов в Qdrant базу данных",
-            "category": "Vector DB"
+            "category": "Vector DB",
+            "theme": "qdrant"
         },
         "Qdrant Search": {
-            "class": QdrantSearchNode,
+            "class": "nodes.vector_db.qdrant_nodes:QdrantSearchNode",
             "node_store": "REGISTRY",
             "description": "Поиск похожих векторов в Qdrant",
-            "category": "Vector DB"
+            "category": "Vector DB",
+            "theme": "qdrant"
         },
     },
 }
 
+# Загруженные классы нод: {путь: класс} и тема каждого класса
+_loaded_classes = {}
+_class_themes = {}
+
+
+# === Наборы нод из entry points ===
+
+def _entry_points():
+    from importlib import metadata
+    try:
+        return list(metadata.entry_points(group=NODE_PACKS_GROUP))
+    except TypeError:
+        # Python < 3.10: entry_points() возвращает словарь по группам
+        return list(metadata.entry_points().get(NODE_PACKS_GROUP, ()))
+
+
+def _fingerprint(entry_points):
+    """Отпечаток набора entry points: меняется при установке, удалении или обновлении пакета."""
+    items = []
+    for entry_point in entry_points:
+        dist = getattr(entry_point, "dist", None)
+        version = dist.version if dist is not None else ""
+        items.append(f"{entry_point.name}={entry_point.value}@{version}")
+    return sorted(items)
+
+
+def _read_manifest_cache(fingerprint):
+    try:
+        with open(NODE_PACKS_CACHE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cache.get("fingerprint") != fingerprint:
+        return None
+    return cache.get("packs")
+
+
+def _write_manifest_cache(fingerprint, packs):
+    try:
+        os.makedirs(os.path.dirname(NODE_PACKS_CACHE), exist_ok=True)
+        with open(NODE_PACKS_CACHE, 'w', encoding='utf-8') as f:
+            json.dump({"fingerprint": fingerprint, "packs": packs}, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        log.warning("Could not write node pack cache %s: %s", NODE_PACKS_CACHE, e)
+
+
+def _load_manifests(entry_points):
+    """Загружает манифесты наборов нод. Возвращает {имя entry point: {категория: {нода: метаданные}}}."""
+    packs = {}
+    for entry_point in entry_points:
+        try:
+            manifest = entry_point.load()
+            if callable(manifest):
+                manifest = manifest()
+            packs[entry_point.name] = {
+                category: {name: dict(info) for name, info in nodes.items() if isinstance(info.get("class"), str)}
+                for category, nodes in manifest.items()
+            }
+        except Exception as e:
+            log.error("Could not load node pack '%s' (%s): %s", entry_point.name, entry_point.value, e)
+    return packs
+
+
+def load_node_packs(use_cache=True):
+    """Добавляет в NODE_REGISTRY ноды сторонних наборов. Возвращает число добавленных нод."""
+    entry_points = _entry_points()
+    if not entry_points:
+        return 0
+    fingerprint = _fingerprint(entry_points)
+    packs = _read_manifest_cache(fingerprint) if use_cache else None
+    if packs is None:
+        packs = _load_manifests(entry_points)
+        _write_manifest_cache(fingerprint, packs)
+
+    added = 0
+    for pack_name, manifest in packs.items():
+        for category, nodes in manifest.items():
+            registry_category = NODE_REGISTRY.setdefault(category, {})
+            for name, info in nodes.items():
+                if name in registry_category:
+                    log.warning("Node '%s' from pack '%s' conflicts with an existing node, skipped", name, pack_name)
+                    continue
+                info.setdefault("node_store", pack_name)
+                info.setdefault("category", category)
+                registry_category[name] = info
+                added += 1
+    log.info("Loaded %d nodes from %d node packs", added, len(packs))
+    return added
+
+
+# === Ленивая загрузка классов ===
+
+def find_node_info(node_name):
+    """Метаданные ноды по имени или None."""
+    for category, nodes in NODE_REGISTRY.items():
+        if node_name in nodes:
+            return nodes[node_name]
+    return None
+
+
+def _import_class(path):
+    """'пакет.модуль:Класс' (или 'пакет.модуль.Класс') -> класс."""
+    node_class = _loaded_classes.get(path)
+    if node_class is None:
+        module_name, _, class_name = path.partition(":") if ":" in path else path.rpartition(".")
+        node_class = getattr(importlib.import_module(module_name), class_name)
+        _loaded_classes[path] = node_class
+    return node_class
+
+
+def get_node_class(node_name):
+    """Класс ноды по имени в реестре (модуль импортируется при первом обращении) или None."""
+    node_info = find_node_info(node_name)
+    if node_info is None:
+        return None
+    try:
+        node_class = _import_class(node_info["class"])
+    except Exception as e:
+        # Например, не установлен llama_cpp или qdrant_client
+        log.error("Could not load node '%s' from %s: %s", node_name, node_info["class"], e)
+        return None
+    if node_info.get("theme"):
+        _class_themes[node_class] = node_info["theme"]
+    return node_class
+
+
 created_nodes = {}  # Словарь: {node_id: instance}
 
 # === ГЛОБАЛЬНЫЕ ТЕМЫ ДЛЯ РАЗНЫХ ТИПОВ НОД ===
@@ -130,26 +283,32 @@ def register_node(instance):
         # Автоматически применяем тему при регистрации
         apply_theme_to_node(instance)
 
+def register_nodes(instances):
+    """Регистрирует много нод сразу (GraphBatch): темы назначаются одним проходом, без вывода на каждую ноду."""
+    themes = {"qdrant": qdrant_theme, "llm": llm_theme, "math": math_theme}
+    registered = 0
+    for instance in instances:
+        if not instance.node_id:
+            continue
+        created_nodes[instance.node_id] = instance
+        registered += 1
+        theme = themes.get(_class_themes.get(type(instance)))
+        if theme:
+            dpg.bind_item_theme(instance.node_id, theme)
+    log.info("Registered %d nodes", registered)
+    return registered
+
 def apply_theme_to_node(instance):
     """Применяет тему к конкретной ноде на основе её типа"""
     if not instance.node_id or not dpg.does_item_exist(instance.node_id):
         return
     
-    # Определяем тип ноды по классу
-    if isinstance(instance, (QdrantAddNode, QdrantSearchNode)):
-        if qdrant_theme:
-            dpg.bind_item_theme(instance.node_id, qdrant_theme)
-            print(f"🎨 Applied Qdrant theme to {instance.label}")
-    
-    elif isinstance(instance, (LLaMANode, UserInputPromptNode, SystemPromptNode)):
-        if llm_theme:
-            dpg.bind_item_theme(instance.node_id, llm_theme)
-            print(f"🎨 Applied LLM theme to {instance.label}")
-    
-    elif isinstance(instance, (AddNode, MultiplyNode)):
-        if math_theme:
-            dpg.bind_item_theme(instance.node_id, math_theme)
-            print(f"🎨 Applied Math theme to {instance.label}")
+    # Тема берётся из метаданных реестра (ключ "theme") по классу ноды
+    theme_name = _class_themes.get(type(instance))
+    theme = {"qdrant": qdrant_theme, "llm": llm_theme, "math": math_theme}.get(theme_name)
+    if theme:
+        dpg.bind_item_theme(instance.node_id, theme)
+        print(f"🎨 Applied {theme_name} theme to {instance.label}")
 
 def change_theme():
     """Применяет темы ко всем зарегистрированным нодам"""
@@ -180,17 +339,20 @@ def create_node_instance(node_name, **kwargs):
     Returns:
         instance: Экземпляр ноды или None, если нода не найдена
     """
-    # Ищем ноду по всем категориям
-    for category, nodes in NODE_REGISTRY.items():
-        if node_name in nodes:
-            node_info = nodes[node_name]
-            node_class = node_info["class"]
-            
-            # Создаем экземпляр ноды с переданными аргументами
-            instance = node_class(**kwargs)
-            return instance
-    
-    print(f"⚠️ Node '{node_name}' not found in registry")
-    return None
+    if find_node_info(node_name) is None:
+        print(f"⚠️ Node '{node_name}' not found in registry")
+        return None
+
+    # Модуль ноды импортируется здесь, при первом создании
+    node_class = get_node_class(node_name)
+    if node_class is None:
+        return None
+
+    # Создаем экземпляр ноды с переданными аргументами
+    instance = node_class(**kwargs)
+    return instance
+
+
+load_node_packs()
 
 
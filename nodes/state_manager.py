@@ -4,9 +4,11 @@ import time
 import dearpygui.dearpygui as dpg
 
 # === НЕОБХОДИМЫЕ ИМПОРТЫ ===
-from .registry import create_node_instance, register_node, created_nodes, NODE_REGISTRY
+from .registry import created_nodes, get_node_class
+from .graph_batch import GraphBatch
+from .execution_manager import execution_manager
+from .culling import viewport_culler
 from .base_node import BaseNode  # ← для attr_id_to_key_map
-from .llm_nodes.llama_node import LLaMANode
 
 
 class StateManager:
@@ -108,98 +110,80 @@ class StateManager:
                 state = json.load(f)
 
             # Очищаем текущий node editor
+            from .factory import active_links
             dpg.delete_item("node_editor", children_only=True)
             created_nodes.clear()
+            viewport_culler.reset()
+            BaseNode.attr_id_to_key_map.clear()
+            active_links.clear()
 
             # Создаём маппинг старых ID → новых
             old_to_new_node_ids = {}
 
-            # Восстанавливаем ноды
-            for node_data in state["nodes"]:
-                node_type = node_data.get("label")
-                if not node_type:
-                    print(f"⚠️ Пропущен узел без label: {node_data}")
-                    continue
-
-                pos = node_data.get("pos", [100, 100])
-                # Убедимся, что pos — это список/кортеж из двух чисел
-                if isinstance(pos, list) and len(pos) == 2:
-                    pass
-                elif isinstance(pos, (tuple, list)) and len(pos) >= 2:
-                    pos = [pos[0], pos[1]]
-                else:
-                    pos = [100, 100]
-
-                node = create_node_instance(node_type, parent="node_editor", pos=pos)
-                if not node:
-                    print(f"⚠️ Не удалось создать узел типа '{node_type}'")
-                    continue
-
-                node_id = node.create()
-                register_node(node)
-
-                original_id = node_data.get("id")
-                if original_id is not None:
-                    old_to_new_node_ids[original_id] = node_id
-
-                # Восстанавливаем состояние
-                if hasattr(node, 'from_dict'):
-                    node.from_dict(node_data)
-
-            # ⚠️ КРИТИЧНО: дать DPG обработать атрибуты
-            time.sleep(0.1)
-            dpg.split_frame()  # ← принудительно обновляет UI и регистрирует атрибуты
-            time.sleep(0.2)
-
-            print(f"🔍 attr_id_to_key_map после создания нод = {BaseNode.attr_id_to_key_map}")
-
-            # Восстанавливаем связи по логическим ключам
-            for link_data in state.get("links", []):
-                source_node_old_id = link_data.get("source_node_id")
-                target_node_old_id = link_data.get("target_node_id")
-                source_key = link_data.get("source_key")
-                target_key = link_data.get("target_key")
-
-                if not all([source_node_old_id, target_node_old_id, source_key, target_key]):
-                    print(f"⚠️ Неполные данные связи: {link_data}")
-                    continue
-
-                new_source_id = old_to_new_node_ids.get(source_node_old_id)
-                new_target_id = old_to_new_node_ids.get(target_node_old_id)
-
-                if not (new_source_id and new_target_id):
-                    print(f"⚠️ Не найдены новые ID для связи: {source_node_old_id} → {target_node_old_id}")
-                    continue
-
-                # Ищем атрибуты по node_id + key
-                src_attr = next(
-                    (
-                        attr_id for attr_id, (nid, t, k) in BaseNode.attr_id_to_key_map.items()
-                        if nid == new_source_id and t == "output" and k == source_key
-                    ),
-                    None
-                )
-                tgt_attr = next(
-                    (
-                        attr_id for attr_id, (nid, t, k) in BaseNode.attr_id_to_key_map.items()
-                        if nid == new_target_id and t == "input" and k == target_key
-                    ),
-                    None
-                )
-
-                print(f"🔍 Попытка восстановить связь: {new_source_id}.{source_key} → {new_target_id}.{target_key}")
-                print(f"   Найденные атрибуты: src={src_attr}, tgt={tgt_attr}")
-
-                if not (src_attr and tgt_attr):
-                    print(f"❌ Не найдены все необходимые атрибуты!")
-                    continue
-
-                # ✅ Попытка создания связи
-                try:
-                    link_id = dpg.add_node_link(src_attr, tgt_attr, parent="node_editor")
-                    print(f"✅ Связь создана: {link_id} ({src_attr} → {tgt_attr})")
-                except Exception as e:
-                    print(f"❌ Ошибка при создании связи: {e}")
+            # Ноды и связи создаются одним пакетом: регистрация, темы и пересборка
+            # плана выполняются один раз в конце
+            with GraphBatch() as batch:
+                for node_id in list(execution_manager.node_instances):
+                    execution_manager.unregister_node(node_id)
+
+                # Восстанавливаем ноды
+                for node_data in state["nodes"]:
+                    node_type = node_data.get("label")
+                    if not node_type:
+                        print(f"⚠️ Пропущен узел без label: {node_data}")
+                        continue
+
+                    pos = node_data.get("pos", [100, 100])
+                    # Убедимся, что pos — это список/кортеж из двух чисел
+                    if isinstance(pos, list) and len(pos) == 2:
+                        pass
+                    elif isinstance(pos, (tuple, list)) and len(pos) >= 2:
+                        pos = [pos[0], pos[1]]
+                    else:
+                        pos = [100, 100]
+
+                    node = batch.add_node(node_type, pos=pos)
+                    if not node:
+                        print(f"⚠️ Не удалось создать узел типа '{node_type}'")
+                        continue
+                    node_id = node.node_id
+
+                    original_id = node_data.get("id")
+                    if original_id is not None:
+                        old_to_new_node_ids[original_id] = node_id
+
+                    # Восстанавливаем состояние
+                    if hasattr(node, 'from_dict'):
+                        node.from_dict(node_data)
+
+                # ⚠️ КРИТИЧНО: дать DPG обработать атрибуты
+                time.sleep(0.1)
+                dpg.split_frame()  # ← принудительно обновляет UI и регистрирует атрибуты
+                time.sleep(0.2)
+
+                print(f"🔍 attr_id_to_key_map после создания нод: {len(BaseNode.attr_id_to_key_map)} атрибутов")
+
+                # Восстанавливаем связи по логическим ключам
+                for link_data in state.get("links", []):
+                    source_node_old_id = link_data.get("source_node_id")
+                    target_node_old_id = link_data.get("target_node_id")
+                    source_key = link_data.get("source_key")
+                    target_key = link_data.get("target_key")
+
+                    if not all([source_node_old_id, target_node_old_id, source_key, target_key]):
+                        print(f"⚠️ Неполные данные связи: {link_data}")
+                        continue
+
+                    new_source_id = old_to_new_node_ids.get(source_node_old_id)
+                    new_target_id = old_to_new_node_ids.get(target_node_old_id)
+
+                    if not (new_source_id and new_target_id):
+                        print(f"⚠️ Не найдены новые ID для связи: {source_node_old_id} → {target_node_old_id}")
+                        continue
+
+                    # Атрибуты ищутся по node_id + key (обратный индекс реестра атрибутов)
+                    if batch.add_link(new_source_id, source_key, new_target_id, target_key) is None:
+                        print(f"❌ Не удалось восстановить связь: {new_source_id}.{source_key} → {new_target_id}.{target_key}")
 
             # Ещё раз обновляем UI
             time.sleep(0.1)
@@ -231,11 +215,7 @@ class StateManager:
 
     def _get_node_class_by_type(self, node_type):
         """Получить класс ноды по типу"""
-        for category, nodes in NODE_REGISTRY.items():
-            for node_name, node_config in nodes.items():
-                if node_name == node_type:
-                    return node_config["class"]
-        return None
+        return get_node_class(node_type)
 
     def get_recent_files(self):
         """Получить список последних сохраненных файлов"""
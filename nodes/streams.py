@@ -0,0 +1,108 @@
+# nodes/streams.py
+# Потоковые порты: выход ноды может нести TokenStream — канал фрагментов текста,
+# который пополняется, пока нода-источник ещё работает (генерация LLaMA).
+#
+# Получатели с accepts_streams = True получают сам поток сразу и пересчитываются
+# на каждом новом фрагменте (читают stream.text или итерируют stream).
+# Остальные получают обычную строку — полный текст, когда поток закрыт.
+
+import logging
+import threading
+
+log = logging.getLogger(__name__)
+
+
+class TokenStream:
+    """
+    Поток фрагментов текста: один писатель, любое число читателей, из любых потоков.
+    Слушатели (add_listener) вызываются в потоке писателя после каждого write() и close().
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._text = ""
+        self._joined = 0          # сколько фрагментов уже в _text
+        self._condition = threading.Condition()
+        self._listeners = []
+        self.closed = False
+        self.error = None
+
+    def add_listener(self, callback):
+        """callback(stream) — после каждого нового фрагмента и при закрытии."""
+        self._listeners.append(callback)
+
+    def _notify(self):
+        for callback in list(self._listeners):
+            try:
+                callback(self)
+            except Exception as e:
+                log.error("Stream listener failed: %s", e)
+
+    def write(self, chunk):
+        if not chunk:
+            return
+        with self._condition:
+            if self.closed:
+                raise ValueError("write to a closed stream")
+            self._chunks.append(chunk)
+            self._condition.notify_all()
+        self._notify()
+
+    def close(self, error=None):
+        """Завершает поток; error — текст ошибки, если генерация прервалась."""
+        with self._condition:
+            if self.closed:
+                return
+            self.closed = True
+            self.error = error
+            self._condition.notify_all()
+        self._notify()
+
+    @property
+    def text(self):
+        """Текст, полученный на данный момент."""
+        with self._condition:
+            if self._joined < len(self._chunks):
+                self._text += "".join(self._chunks[self._joined:])
+                self._joined = len(self._chunks)
+            return self._text
+
+    def __len__(self):
+        return len(self.text)
+
+    def wait(self, timeout=None):
+        """Ждёт закрытия потока. Возвращает True, если поток закрыт."""
+        with self._condition:
+            return self._condition.wait_for(lambda: self.closed, timeout)
+
+    def __iter__(self):
+        """Фрагменты по мере поступления (блокируется до закрытия) — для чтения из рабочих потоков."""
+        index = 0
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: index < len(self._chunks) or self.closed)
+                chunks = self._chunks[index:]
+                closed = self.closed
+            index += len(chunks)
+            yield from chunks
+            if closed and not chunks:
+                return
+
+    def __repr__(self):
+        state = "error" if self.error else "closed" if self.closed else "open"
+        return f"TokenStream({len(self)} chars, {state})"
+
+
+def link_value(value, target_node_instance):
+    """
+    Значение для передачи по связи. Нода без accepts_streams вместо потока
+    получает его полный текст после закрытия; None — пока передавать нечего.
+    """
+    if isinstance(value, TokenStream) and not target_node_instance.accepts_streams:
+        return value.text if value.closed else None
+    return value
+
+
+def resolve_streams(values):
+    """Копия словаря, в которой потоки заменены их текстом (для сохранения состояния)."""
+    return {key: value.text if isinstance(value, TokenStream) else value for key, value in values.items()}
@@ -1,4 +1,6 @@
 # nodes/tabs/llm_tab.py
+import threading
+
 import dearpygui.dearpygui as dpg
 from nodes.llm_chat_manager import llm_chat_manager
 
@@ -91,9 +93,10 @@ class LLMTab:
                     f"{msg['role'].capitalize()}: {msg['content']}"
                     for msg in context
                 )
-                # Запускаем генерацию (можно обернуть в поток)
+                # Генерация идёт в фоновом потоке, чтобы не блокировать UI;
+                # ответ попадает в чат через связанную с ней ноду LLM Output
                 instance.last_prompt = prompt
-                instance.generate_background(prompt)
+                threading.Thread(target=instance.generate_background, args=(prompt,), daemon=True).start()
                 return
 
         dpg.set_value("llm_chat_output", "⚠️ LLaMA-нода не найдена или модель не загружена.")
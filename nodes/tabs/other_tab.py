@@ -1,8 +1,288 @@
 # nodes/tabs/other_tab.py
+import os
+import time
 import dearpygui.dearpygui as dpg
+from nodes.execution_manager import execution_manager
+from nodes.state_manager import state_manager
+from nodes.culling import viewport_culler
+from nodes.log import SUBSYSTEMS, LEVELS, get_level, set_level
+
+# Колонки таблицы профилировщика: (ключ строки NodeProfiler, заголовок)
+PROFILER_COLUMNS = [
+    ("label", "Node"),
+    ("calls", "Calls"),
+    ("errors", "Errors"),
+    ("avg_ms", "Avg ms"),
+    ("max_ms", "Max ms"),
+    ("total_ms", "Total ms"),
+    ("cpu_ms", "CPU ms"),
+    ("propagate_ms", "Propagate ms"),
+    ("last_ms", "Last ms"),
+]
+
+# Текущая сортировка таблицы: [ключ, по убыванию]
+_profiler_sort = ["total_ms", True]
 
 
 class OtherTab:
     def create(self, parent_window):
         with dpg.tab(label="  Other  ", parent=parent_window):
-            dpg.add_text("Содержимое вкладки Other")
+            # Настройки выполнения графа
+            dpg.add_text("Execution:")
+            dpg.add_slider_float(
+                label="Speed (Hz)",
+                default_value=execution_manager.execution_speed,
+                min_value=0.1,
+                max_value=120.0,
+                width=200,
+                callback=lambda s, a: execution_manager.set_execution_speed(a)
+            )
+            dpg.add_checkbox(
+                label="Event-driven (run only on changes)",
+                default_value=execution_manager.event_driven,
+                callback=lambda s, a: execution_manager.set_event_driven(a)
+            )
+            dpg.add_checkbox(
+                label="Parallel execution of independent branches",
+                default_value=execution_manager.parallel_execution,
+                callback=lambda s, a: execution_manager.set_parallel_execution(a)
+            )
+            dpg.add_slider_int(
+                label="Worker threads",
+                default_value=execution_manager.max_workers,
+                min_value=1,
+                max_value=32,
+                width=200,
+                callback=lambda s, a: execution_manager.set_parallel_execution(
+                    execution_manager.parallel_execution, max_workers=a)
+            )
+            dpg.add_checkbox(
+                label="Fuse chains of math nodes into one kernel",
+                default_value=execution_manager.fusion_enabled,
+                callback=lambda s, a: execution_manager.set_fusion(a)
+            )
+            dpg.add_checkbox(
+                label="Run compute nodes in process pool",
+                default_value=execution_manager.process_pool_enabled,
+                callback=lambda s, a: execution_manager.set_process_pool_execution(a)
+            )
+            dpg.add_slider_int(
+                label="Worker processes",
+                default_value=execution_manager.process_workers,
+                min_value=1,
+                max_value=max(1, execution_manager.process_workers * 2),
+                width=200,
+                callback=lambda s, a: execution_manager.set_process_pool_execution(
+                    execution_manager.process_pool_enabled, max_workers=a)
+            )
+            dpg.add_slider_int(
+                label="Concurrent async operations",
+                default_value=execution_manager.async_executor.max_concurrency,
+                min_value=1,
+                max_value=256,
+                width=200,
+                callback=lambda s, a: execution_manager.set_async_concurrency(a)
+            )
+            dpg.add_input_int(
+                label="Node timeout (ms, 0 = off)",
+                default_value=int((execution_manager.node_timeout or 0) * 1000),
+                min_value=0,
+                min_clamped=True,
+                width=200,
+                callback=lambda s, a: execution_manager.set_time_limits(
+                    a / 1000.0, execution_manager.tick_budget)
+            )
+            dpg.add_input_int(
+                label="Tick budget (ms, 0 = off)",
+                default_value=int((execution_manager.tick_budget or 0) * 1000),
+                min_value=0,
+                min_clamped=True,
+                width=200,
+                callback=lambda s, a: execution_manager.set_time_limits(
+                    execution_manager.node_timeout, a / 1000.0)
+            )
+            with dpg.group(horizontal=True):
+                dpg.add_text("", tag="execution_stats")
+                dpg.add_button(label="Reset counters", callback=lambda: self._reset_tick_stats())
+
+            dpg.add_separator()
+
+            # Memo-кэш чистых нод
+            dpg.add_text("Memo cache (pure nodes):")
+            with dpg.group(horizontal=True):
+                dpg.add_checkbox(
+                    label="Enabled##memo",
+                    default_value=execution_manager.memo.enabled,
+                    callback=lambda s, a: execution_manager.set_memo(a)
+                )
+                dpg.add_button(label="Clear##memo", callback=lambda: execution_manager.memo.clear())
+            dpg.add_input_int(
+                label="Max entries",
+                default_value=execution_manager.memo.max_size,
+                min_value=1,
+                min_clamped=True,
+                width=200,
+                callback=lambda s, a: execution_manager.set_memo(execution_manager.memo.enabled, max_size=a)
+            )
+            dpg.add_input_int(
+                label="Max size (MB)",
+                default_value=execution_manager.memo.max_bytes // (1024 * 1024),
+                min_value=0,
+                min_clamped=True,
+                width=200,
+                callback=lambda s, a: execution_manager.set_memo(execution_manager.memo.enabled,
+                                                                 max_bytes=a * 1024 * 1024)
+            )
+            dpg.add_text("", tag="memo_stats")
+
+            dpg.add_separator()
+
+            # Сворачивание нод за пределами видимой области редактора
+            dpg.add_text("Viewport culling (large graphs):")
+            dpg.add_checkbox(
+                label="Collapse off-screen nodes",
+                default_value=viewport_culler.enabled,
+                callback=lambda s, a: viewport_culler.set_enabled(a)
+            )
+            dpg.add_input_int(
+                label="Min nodes",
+                default_value=viewport_culler.min_nodes,
+                min_value=0,
+                min_clamped=True,
+                width=200,
+                callback=lambda s, a: setattr(viewport_culler, "min_nodes", a)
+            )
+            dpg.add_text("", tag="culling_stats")
+
+            dpg.add_separator()
+
+            # Профилировщик нод
+            dpg.add_text("Node profiler:")
+            with dpg.group(horizontal=True):
+                dpg.add_checkbox(
+                    label="Enabled",
+                    default_value=execution_manager.profiler.enabled,
+                    callback=lambda s, a: execution_manager.profiler.set_enabled(a)
+                )
+                dpg.add_button(label="Reset", callback=lambda: self._reset_profiler())
+                dpg.add_button(label="Export CSV", callback=lambda: self._export_profiler("csv"))
+                dpg.add_button(label="Export JSON", callback=lambda: self._export_profiler("json"))
+            dpg.add_text("", tag="profiler_status")
+
+            with dpg.table(
+                tag="profiler_table",
+                header_row=True,
+                sortable=True,
+                resizable=True,
+                scrollY=True,
+                height=300,
+                borders_innerH=True,
+                borders_outerH=True,
+                borders_innerV=True,
+                borders_outerV=True,
+                callback=_on_profiler_sort
+            ):
+                for key, title in PROFILER_COLUMNS:
+                    dpg.add_table_column(label=title, user_data=key)
+
+            dpg.add_separator()
+
+            # Запись трассы выполнения для воспроизведения (python -m nodes.trace replay ...)
+            dpg.add_text("Execution trace:")
+            with dpg.group(horizontal=True):
+                dpg.add_button(label="Start recording", callback=lambda: self._start_trace())
+                dpg.add_button(label="Stop recording", callback=lambda: self._stop_trace())
+            dpg.add_text("Not recording", tag="trace_status")
+
+            dpg.add_separator()
+
+            # Уровни логирования по подсистемам
+            dpg.add_text("Logging levels:")
+            for subsystem in SUBSYSTEMS:
+                dpg.add_combo(
+                    items=LEVELS,
+                    label=subsystem,
+                    default_value=get_level(subsystem),
+                    width=120,
+                    callback=lambda s, a, u: set_level(u, a),
+                    user_data=subsystem
+                )
+
+    def _reset_tick_stats(self):
+        execution_manager.reset_tick_stats()
+        refresh_execution_stats()
+
+    def _start_trace(self):
+        path = os.path.join(state_manager.save_dir, f"trace_{int(time.time())}.jsonl")
+        try:
+            execution_manager.start_recording(path)
+            dpg.set_value("trace_status", f"Recording to {path}")
+        except Exception as e:
+            dpg.set_value("trace_status", f"Recording failed: {e}")
+
+    def _stop_trace(self):
+        recorder = execution_manager.recorder
+        execution_manager.stop_recording()
+        if recorder is not None:
+            dpg.set_value("trace_status", f"Saved {recorder.tick_count} ticks to {recorder.path}")
+
+    def _reset_profiler(self):
+        execution_manager.profiler.reset()
+        refresh_profiler_table()
+
+    def _export_profiler(self, fmt):
+        path = os.path.join(state_manager.save_dir, f"profile_{int(time.time())}.{fmt}")
+        try:
+            if fmt == "csv":
+                execution_manager.profiler.export_csv(path)
+            else:
+                execution_manager.profiler.export_json(path)
+            dpg.set_value("profiler_status", f"Exported to {path}")
+        except Exception as e:
+            dpg.set_value("profiler_status", f"Export failed: {e}")
+
+
+def _on_profiler_sort(sender, app_data, user_data=None):
+    """Callback сортировки таблицы: app_data = [[column_id, direction]]"""
+    if not app_data:
+        return
+    column_id, direction = app_data[0]
+    _profiler_sort[0] = dpg.get_item_user_data(column_id)
+    _profiler_sort[1] = direction < 0
+    refresh_profiler_table()
+
+
+def refresh_execution_stats():
+    """Обновляет счётчики перегрузки, memo-кэша и отсечения нод (вызывается из главного цикла)."""
+    if not dpg.does_item_exist("execution_stats"):
+        return
+    stats = execution_manager.tick_stats
+    dpg.set_value("execution_stats",
+                  f"Ticks: {stats['ticks']}  skipped: {stats['skipped_ticks']}  "
+                  f"over budget: {stats['overrun_ticks']}  deferred nodes: {stats['deferred_nodes']}  "
+                  f"timed out: {stats['timed_out_nodes']}")
+    if dpg.does_item_exist("memo_stats"):
+        memo = execution_manager.memo.stats()
+        dpg.set_value("memo_stats",
+                      f"Entries: {memo['size']}/{memo['max_size']}  "
+                      f"size: {memo['bytes'] / (1024 * 1024):.1f}/{memo['max_bytes'] / (1024 * 1024):.0f} MB  "
+                      f"hits: {memo['hits']}  misses: {memo['misses']}  hit rate: {memo['hit_rate']:.0%}  "
+                      f"evicted: {memo['evictions']}  skipped (large): {memo['skipped']}")
+    if dpg.does_item_exist("culling_stats"):
+        culling = viewport_culler.stats()
+        dpg.set_value("culling_stats",
+                      f"Collapsed now: {culling['culled']}  collapsed: {culling['collapsed']}  "
+                      f"restored: {culling['restored']}")
+
+
+def refresh_profiler_table():
+    """Перестраивает строки таблицы профилировщика (вызывается из главного цикла)."""
+    if not dpg.does_item_exist("profiler_table"):
+        return
+    rows = execution_manager.profiler.snapshot(*_profiler_sort)
+    dpg.delete_item("profiler_table", children_only=True, slot=1)
+    for row in rows:
+        with dpg.table_row(parent="profiler_table"):
+            for key, _ in PROFILER_COLUMNS:
+                value = row[key]
+                dpg.add_text(f"{value:.3f}" if isinstance(value, float) else str(value))
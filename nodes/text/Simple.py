@@ -1,13 +1,20 @@
 import dearpygui.dearpygui as dpg
 from ..base_node import BaseNode
+from ..streams import TokenStream
 
 class TextViewerNode(BaseNode):
+    # Показывает текст потока по мере поступления фрагментов
+    accepts_streams = True
+    # Поле просмотра — само место чтения текста, не обрезаем
+    preview_chars = None
+
     def __init__(self, tag_suffix="_stream", parent="node_editor", pos=None):
         super().__init__("LLaMA", parent, pos)
         self.node_tag = f"viewer_node_{tag_suffix}"
         self.input_tag = f"text_display_{tag_suffix}"
         self.width = 400
         self.height = 300
+        self.text_widget = None
 
     def add_node(self, parent_editor):
         with dpg.node(label="Stream Viewer", tag=self.node_tag, parent=parent_editor):
@@ -38,13 +45,28 @@ class TextViewerNode(BaseNode):
 
 
     def _create_inputs(self):
-        # Реализация входов
-        pass
+        with dpg.node_attribute(label="Input", attribute_type=dpg.mvNode_Attr_Input) as attr_id:
+            # Поле только для отображения: значение приходит по связи, не из виджета
+            self.text_widget = dpg.add_input_text(
+                multiline=True,
+                readonly=True,
+                width=self.width,
+                height=self.height,
+                hint="Ожидание данных...",
+            )
+            self._register_attr(attr_id, "input", "text")
+        with dpg.node_attribute(attribute_type=dpg.mvNode_Attr_Static):
+            dpg.add_button(label="Clear", callback=lambda: self._ui_set(self.text_widget, ""))
         
     def _create_outputs(self):  
-        # Реализация выходов
+        # Выходов нет
         pass
         
     def process(self):
-        # Реализация обработки
-        pass
+        text = self.get_input_value("text")
+        if isinstance(text, TokenStream):
+            text = text.text
+        if text is None:
+            return None
+        self._ui_set(self.text_widget, str(text))
+        return text
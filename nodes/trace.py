@@ -0,0 +1,241 @@
+# nodes/trace.py
+# Запись трассы выполнения и детерминированное воспроизведение.
+#
+# Трасса — файл JSON Lines, только дозапись, по записи на строку:
+#   {"type": "graph", "nodes": [{"id": 1, "label": "Add"}, ...], "links": [[1, "result", 2, "a"], ...]}
+#   {"type": "tick", "tick": 5, "t": 1760000000.0, "wall_ms": 0.42,
+#    "nodes": [{"id": 1, "in": {"a": 2.0, "b": 3.0}, "out": {"result": 5.0}, "ms": 0.01}, ...]}
+# Запись "graph" повторяется при каждом изменении топологии. Такты без выполненных нод не пишутся.
+#
+# Воспроизведение (python -m nodes.trace replay trace.jsonl) строит граф в HeadlessEngine,
+# перед каждым тактом подаёт записанные значения ручных входов (не связанных с другими
+# нодами), выполняет такт настоящим планировщиком и сравнивает выходы и время.
+
+import argparse
+import base64
+import json
+import logging
+import threading
+import time
+
+from .dpg_stub import ensure_dearpygui
+
+# Воспроизведение трасс работает и без установленного Dear PyGui
+ensure_dearpygui()
+
+from .preview import is_array
+
+log = logging.getLogger(__name__)
+
+TRACE_VERSION = 1
+
+
+# --- Кодирование значений ---
+def encode_value(value):
+    """Значение -> JSON-совместимый вид. Массивы кодируются base64, прочие объекты — repr."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [encode_value(item) for item in value]
+    if isinstance(value, dict) and all(isinstance(key, str) for key in value):
+        return {key: encode_value(item) for key, item in value.items()}
+    if is_array(value):
+        return {"__ndarray__": base64.b64encode(value.tobytes()).decode("ascii"),
+                "dtype": str(value.dtype), "shape": list(value.shape)}
+    # Не воспроизводится, но позволяет сравнить выходы
+    return {"__repr__": repr(value)[:200]}
+
+
+def decode_value(value):
+    """Обратное к encode_value. Значения, записанные как repr, возвращаются как есть."""
+    if isinstance(value, list):
+        return [decode_value(item) for item in value]
+    if isinstance(value, dict):
+        if "__ndarray__" in value:
+            import numpy as np
+            data = base64.b64decode(value["__ndarray__"])
+            return np.frombuffer(data, dtype=value["dtype"]).reshape(value["shape"]).copy()
+        if "__repr__" in value:
+            return value
+        return {key: decode_value(item) for key, item in value.items()}
+    return value
+
+
+# --- Запись ---
+class TraceRecorder:
+    """
+    Пишет трассу выполнения ExecutionManager. Ноды одного такта могут выполняться
+    в разных потоках, поэтому записи копятся под блокировкой и пишутся в конце такта.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+        self._tick = None
+        self._tick_started = 0.0
+        self.tick_count = 0
+        self.records = 0
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, separators=(",", ":"), ensure_ascii=False, allow_nan=True) + "\n")
+
+    def write_graph(self, node_instances, links):
+        with self._lock:
+            self._write({
+                "type": "graph",
+                "version": TRACE_VERSION,
+                "t": time.time(),
+                "nodes": [{"id": node_id, "label": node.label} for node_id, node in node_instances.items()],
+                "links": [list(link) for link in links],
+            })
+            self._file.flush()
+
+    def begin_tick(self):
+        with self._lock:
+            self.tick_count += 1
+            self._tick = {"type": "tick", "tick": self.tick_count, "t": time.time(), "nodes": []}
+            self._tick_started = time.perf_counter()
+
+    def end_tick(self):
+        with self._lock:
+            tick, self._tick = self._tick, None
+            if tick is None or not tick["nodes"]:
+                return
+            tick["wall_ms"] = (time.perf_counter() - self._tick_started) * 1000.0
+            self._write(tick)
+            self._file.flush()
+
+    @staticmethod
+    def capture_inputs(node_instance):
+        """
+        Разрешённые входы перед выполнением. Для слитой группы (FusedGroup) —
+        входы каждой её ноды. Возвращает [(node_instance, {key: value})].
+        """
+        nodes = getattr(node_instance, "members", (node_instance,))
+        return [(node, {key: encode_value(value) for key, value in node.resolved_inputs().items()})
+                for node in nodes]
+
+    def record(self, captured, seconds):
+        """Записывает выполненные ноды: captured — результат capture_inputs()."""
+        entries = [{"id": node.node_id,
+                    "in": inputs,
+                    "out": {key: encode_value(value) for key, value in node.state["outputs"].items()},
+                    "ms": seconds * 1000.0}
+                   for node, inputs in captured]
+        with self._lock:
+            if self._tick is not None:
+                self._tick["nodes"].extend(entries)
+                self.records += len(entries)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+        log.info("Trace closed: %d ticks, %d node records in %s", self.tick_count, self.records, self.path)
+
+
+def read_trace(path):
+    """Читает записи трассы по одной (генератор)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+# --- Воспроизведение ---
+def _build_engine(graph):
+    from .headless import HeadlessEngine
+    from .registry import create_node_instance
+
+    engine = HeadlessEngine()
+    for node_data in graph["nodes"]:
+        node = create_node_instance(node_data["label"], parent=None)
+        if not node:
+            log.warning("Skipped node of unknown type '%s'", node_data["label"])
+            continue
+        node.headless = True
+        engine.add_node(node, node_data["id"])
+    for source_node_id, source_key, target_node_id, target_key in graph["links"]:
+        if source_node_id in engine.nodes and target_node_id in engine.nodes:
+            engine.connect(source_node_id, source_key, target_node_id, target_key)
+    return engine
+
+
+def replay(path, engine_factory=_build_engine, max_mismatches=100):
+    """
+    Воспроизводит трассу. engine_factory(graph_record) -> HeadlessEngine
+    (по умолчанию ноды создаются из реестра по label).
+    Возвращает отчёт: число тактов, расхождения выходов, записанное и текущее время.
+    """
+    engine = None
+    report = {"ticks": 0, "node_records": 0, "mismatches": [], "mismatch_count": 0,
+              "recorded_ms": 0.0, "replayed_ms": 0.0}
+
+    for record in read_trace(path):
+        if record["type"] == "graph":
+            # Топология изменилась — граф строится заново по новой записи
+            engine = engine_factory(record)
+            continue
+        if record["type"] != "tick" or engine is None:
+            continue
+
+        bound = engine.execution_manager.plan.input_bindings
+        for entry in record["nodes"]:
+            node = engine.nodes.get(entry["id"])
+            if node is None:
+                continue
+            linked = {key for key, _, _ in bound.get(entry["id"], ())}
+            for key, value in entry["in"].items():
+                # Значения по связям граф вычислит сам; ручные входы подаём, только если они изменились
+                if key not in linked and encode_value(node.get_input_value(key)) != value:
+                    node.set_widget_value(key, decode_value(value))
+
+        started = time.perf_counter()
+        engine.tick()
+        engine.execution_manager.wait_for_background()
+        report["replayed_ms"] += (time.perf_counter() - started) * 1000.0
+        report["recorded_ms"] += record.get("wall_ms", 0.0)
+        report["ticks"] += 1
+
+        for entry in record["nodes"]:
+            report["node_records"] += 1
+            node = engine.nodes.get(entry["id"])
+            outputs = node.state["outputs"] if node is not None else {}
+            for key, recorded in entry["out"].items():
+                replayed = encode_value(outputs.get(key))
+                if replayed != recorded:
+                    report["mismatch_count"] += 1
+                    if len(report["mismatches"]) < max_mismatches:
+                        report["mismatches"].append({"tick": record["tick"], "node_id": entry["id"], "key": key,
+                                                     "recorded": recorded, "replayed": replayed})
+
+    if report["replayed_ms"] > 0:
+        report["speedup"] = report["recorded_ms"] / report["replayed_ms"]
+    return report
+
+
+def main(argv=None):
+    from .log import configure_logging
+
+    parser = argparse.ArgumentParser(description="Replay an execution trace without Dear PyGui")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    replay_parser = subparsers.add_parser("replay", help="Replay a trace and compare outputs and timings")
+    replay_parser.add_argument("trace", help="Path to a trace file (JSON Lines)")
+    replay_parser.add_argument("--output", default=None, help="Write the report to this JSON file")
+    replay_parser.add_argument("--log-level", default="WARNING", help="Logging level (DEBUG, INFO, WARNING, ERROR)")
+    args = parser.parse_args(argv)
+    configure_logging(args.log_level.upper())
+
+    report = replay(args.trace)
+    text = json.dumps(report, indent=2, ensure_ascii=False, default=str)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+    return 1 if report["mismatch_count"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,117 @@
+# nodes/ui_queue.py
+# Очередь обновлений UI. Рабочие потоки (поток выполнения, генерация LLaMA, async-ноды)
+# не вызывают Dear PyGui напрямую, а кладут сюда set_value/configure_item.
+# Главный цикл в main.py вызывает flush() один раз за кадр; от нескольких записей
+# в один виджет за кадр применяется только последняя.
+# Обновления задержанных виджетов (hold — например, свёрнутых нод вне экрана)
+# остаются в очереди до release().
+
+import logging
+import threading
+
+import dearpygui.dearpygui as dpg
+
+log = logging.getLogger(__name__)
+
+
+class UIUpdateQueue:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {}    # {item: value} — последнее значение за кадр
+        self._configs = {}   # {item: {параметр: значение}} — параметры сливаются
+        self._held = set()   # виджеты, обновления которых ждут release()
+        self.posted = 0      # всего поставлено обновлений
+        self.applied = 0     # всего применено (posted - applied = отброшено слиянием)
+
+    @staticmethod
+    def _on_render_thread():
+        return threading.current_thread() is threading.main_thread()
+
+    def set_value(self, item, value):
+        """dpg.set_value из любого потока."""
+        if self._on_render_thread():
+            # Вызов из UI-потока применяется сразу; отложенная запись в тот же
+            # виджет устарела и не должна перезаписать его при flush()
+            with self._lock:
+                self._values.pop(item, None)
+            dpg.set_value(item, value)
+            return
+        with self._lock:
+            self._values[item] = value
+            pending = self._configs.get(item)
+            if pending:
+                pending.pop("default_value", None)
+            self.posted += 1
+
+    def configure_item(self, item, **kwargs):
+        """dpg.configure_item из любого потока."""
+        if self._on_render_thread():
+            with self._lock:
+                pending = self._configs.get(item)
+                if pending:
+                    for key in kwargs:
+                        pending.pop(key, None)
+                if "default_value" in kwargs:
+                    self._values.pop(item, None)
+            dpg.configure_item(item, **kwargs)
+            return
+        with self._lock:
+            self._configs.setdefault(item, {}).update(kwargs)
+            if "default_value" in kwargs:
+                self._values.pop(item, None)
+            self.posted += 1
+
+    def hold(self, items):
+        """Задерживает обновления виджетов items до release()."""
+        with self._lock:
+            self._held.update(items)
+
+    def release(self, items):
+        """Снимает задержку; накопленные обновления применятся при следующем flush()."""
+        with self._lock:
+            self._held.difference_update(items)
+
+    def flush(self):
+        """Применяет накопленные обновления (только из UI-потока). Возвращает их число."""
+        with self._lock:
+            if not self._values and not self._configs:
+                return 0
+            values, self._values = self._values, {}
+            configs, self._configs = self._configs, {}
+            if self._held:
+                # Задержанные обновления остаются в очереди
+                for item in [item for item in values if item in self._held]:
+                    self._values[item] = values.pop(item)
+                for item in [item for item in configs if item in self._held]:
+                    self._configs[item] = configs.pop(item)
+
+        applied = 0
+        for item, kwargs in configs.items():
+            if not kwargs or not dpg.does_item_exist(item):
+                continue
+            try:
+                dpg.configure_item(item, **kwargs)
+                applied += 1
+            except Exception as e:
+                log.warning("Could not configure item %s: %s", item, e)
+        for item, value in values.items():
+            if not dpg.does_item_exist(item):
+                continue
+            try:
+                dpg.set_value(item, value)
+                applied += 1
+            except Exception as e:
+                log.warning("Could not set value of item %s: %s", item, e)
+
+        self.applied += applied
+        log.debug("Flushed %d UI updates", applied)
+        return applied
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+            self._configs.clear()
+            self._held.clear()
+
+
+ui_queue = UIUpdateQueue()
@@ -1,14 +1,16 @@
 # nodes\vector_db\qdrant_nodes.py
+import asyncio
 import dearpygui.dearpygui as dpg
 from ..base_node import BaseNode
 from qdrant_client import QdrantClient
 from qdrant_client.models import Distance, VectorParams, PointStruct
 import numpy as np
 import json
+import logging
 import os
 import uuid
-import tkinter as tk
-from tkinter import filedialog
+
+log = logging.getLogger(__name__)
 
 class QdrantAddNode(BaseNode):
     """Нода для добавления векторов в Qdrant в локальном режиме"""
@@ -136,6 +138,9 @@ class QdrantAddNode(BaseNode):
 
     def browse_storage_path(self):
         """Диалог выбора пути к хранилищу"""
+        # tkinter нужен только для диалога — импортируем при первом вызове
+        import tkinter as tk
+        from tkinter import filedialog
         root = tk.Tk()
         root.withdraw()
         path = filedialog.askdirectory()
@@ -165,9 +170,13 @@ class QdrantAddNode(BaseNode):
             self.is_connected = False
 
     def add_point(self):
-        """Добавить точку в коллекцию"""
+        """Добавить точку в коллекцию (в фоне, не блокируя UI)"""
+        self.run_async(self.add_point_async)
+
+    async def add_point_async(self):
+        """Добавление точки; запросы к клиенту выполняются в пуле I/O-потоков AsyncExecutor"""
         if not self.is_connected or not self.client:
-            dpg.set_value(self.outputs["status"], "Not connected. Click 'Connect' first.")
+            self._ui_set(self.outputs["status"], "Not connected. Click 'Connect' first.")
             return
             
         try:
@@ -176,7 +185,7 @@ class QdrantAddNode(BaseNode):
             
             vector_str = self.get_input_value("vector")
             if not vector_str:
-                dpg.set_value(self.outputs["status"], "Error: Vector is empty")
+                self._ui_set(self.outputs["status"], "Error: Vector is empty")
                 return
                 
             try:
@@ -186,7 +195,7 @@ class QdrantAddNode(BaseNode):
                 if len(vector) != vector_size:
                     print(f"⚠️ Warning: Expected vector size {vector_size}, got {len(vector)}")
             except json.JSONDecodeError as e:
-                dpg.set_value(self.outputs["status"], f"Error: Invalid JSON vector - {e}")
+                self._ui_set(self.outputs["status"], f"Error: Invalid JSON vector - {e}")
                 return
                 
             payload_str = self.get_input_value("payload") or "{}"
@@ -195,18 +204,19 @@ class QdrantAddNode(BaseNode):
                 if not isinstance(payload, dict):
                     raise ValueError("Payload must be a dictionary")
             except json.JSONDecodeError as e:
-                dpg.set_value(self.outputs["status"], f"Error: Invalid JSON payload - {e}")
+                self._ui_set(self.outputs["status"], f"Error: Invalid JSON payload - {e}")
                 return
                 
             try:
-                collections = self.client.get_collections().collections
+                collections = (await asyncio.to_thread(self.client.get_collections)).collections
                 collection_names = [c.name for c in collections]
             except Exception as e:
                 print(f"Warning: Could not get collections list: {e}")
                 collection_names = []
                 
             if collection_name not in collection_names:
-                self.client.create_collection(
+                await asyncio.to_thread(
+                    self.client.create_collection,
                     collection_name=collection_name,
                     vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE)
                 )
@@ -214,7 +224,8 @@ class QdrantAddNode(BaseNode):
                 
             point_id = str(uuid.uuid4())
             
-            self.client.upsert(
+            await asyncio.to_thread(
+                self.client.upsert,
                 collection_name=collection_name,
                 points=[
                     PointStruct(
@@ -225,18 +236,19 @@ class QdrantAddNode(BaseNode):
                 ]
             )
             
-            dpg.set_value(self.outputs["status"], f"Success: Point added")
-            dpg.set_value(self.outputs["point_id"], point_id)
+            self._ui_set(self.outputs["status"], f"Success: Point added")
+            self._ui_set(self.outputs["point_id"], point_id)
             self.last_result = point_id
+            self.mark_dirty("qdrant")
             print(f"✅ Point {point_id} added to {collection_name}")
             
         except Exception as e:
             error_text = f"Error: {str(e)}"
-            dpg.set_value(self.outputs["status"], error_text)
+            self._ui_set(self.outputs["status"], error_text)
             print(f"❌ Ошибка добавления точки: {e}")
 
     def process(self):
-        print(f"QdrantAddNode {self.label} processing")
+        log.debug("QdrantAddNode %s processing", self.label)
         return self.last_result
 
     def to_dict(self):
@@ -404,6 +416,9 @@ class QdrantSearchNode(BaseNode):
 
     def browse_storage_path(self):
         """Диалог выбора пути к хранилищу"""
+        # tkinter нужен только для диалога — импортируем при первом вызове
+        import tkinter as tk
+        from tkinter import filedialog
         root = tk.Tk()
         root.withdraw()
         path = filedialog.askdirectory()
@@ -431,7 +446,11 @@ class QdrantSearchNode(BaseNode):
             self.is_connected = False
 
     def search(self):
-        """Поиск похожих векторов"""
+        """Поиск похожих векторов (в фоне, не блокируя UI)"""
+        self.run_async(self.search_async)
+
+    async def search_async(self):
+        """Поиск; запрос к клиенту выполняется в пуле I/O-потоков AsyncExecutor"""
         if not self.is_connected or not self.client:
             self.set_output_value("results", "Error: Not connected")
             return
@@ -453,7 +472,8 @@ class QdrantSearchNode(BaseNode):
                 self.set_output_value("results", f"Error: Invalid JSON - {e}")
                 return
                 
-            search_result = self.client.search(
+            search_result = await asyncio.to_thread(
+                self.client.search,
                 collection_name=collection_name,
                 query_vector=query_vector,
                 limit=top_k
@@ -470,6 +490,7 @@ class QdrantSearchNode(BaseNode):
             self.set_output_value("results", results_text)
             self.set_output_value("count", str(len(search_result)))
             self.last_results = search_result
+            self.mark_dirty("qdrant")
             print(f"✅ Found {len(search_result)} results")
             
         except Exception as e:
@@ -478,7 +499,7 @@ class QdrantSearchNode(BaseNode):
             print(f"❌ Ошибка поиска: {e}")
 
     def process(self):
-        print(f"QdrantSearchNode {self.label} processing")
+        log.debug("QdrantSearchNode %s processing", self.label)
         return self.last_results
 
     def to_dict(self):
@@ -0,0 +1,83 @@
+# tests/test_time_limits.py
+# Таймаут ноды (node_timeout): медленные ноды не задерживают такт — ни в пуле
+# потоков, ни в пуле процессов — и не отнимают потоки у остальных нод.
+# Запуск из корня проекта: python -m unittest discover tests
+
+import time
+import unittest
+
+from nodes.headless import HeadlessEngine
+from nodes.math_nodes.math_simple import AddNode
+
+
+def slow_add(a, b):
+    time.sleep(1.0)
+    return {"result": a + b}
+
+
+class SlowComputeNode(AddNode):
+    """Add, чья compute_function (в пуле процессов) считает 1 с."""
+    compute_function = staticmethod(slow_add)
+    pure = False
+
+
+class SlowProcessNode(AddNode):
+    """Add, чей process() (в пуле потоков) считает 1 с."""
+    pure = False
+
+    def process(self):
+        time.sleep(1.0)
+        super().process()
+
+
+class NodeTimeoutTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = HeadlessEngine()
+        self.manager = self.engine.execution_manager
+
+    def tearDown(self):
+        self.manager.wait_for_background(timeout=5)
+        self.manager.shutdown()
+
+    def _add(self, node_class, a=1.0, b=2.0):
+        node_id = self.engine.add_node(node_class(parent=None))
+        self.engine.set_input(node_id, "a", a)
+        self.engine.set_input(node_id, "b", b)
+        return node_id
+
+    def _output(self, node_id):
+        return self.engine.nodes[node_id].state["outputs"].get("result")
+
+    def test_process_pool_node_respects_timeout(self):
+        self.manager.set_process_pool_execution(True, 1)
+        self.manager.set_time_limits(node_timeout=0.05)
+        slow = self._add(SlowComputeNode)
+
+        started = time.perf_counter()
+        self.engine.tick()
+        elapsed = time.perf_counter() - started
+
+        self.assertLess(elapsed, 0.8)
+        self.assertEqual(self.manager.tick_stats["timed_out_nodes"], 1)
+        # Результат опоздавшей ноды применяется, когда процесс завершится
+        self.assertTrue(self.manager.wait_for_background(timeout=5))
+        self.assertEqual(self._output(slow), 3.0)
+
+    def test_late_nodes_do_not_starve_others(self):
+        self.manager.set_time_limits(node_timeout=0.05)
+        slow_nodes = [self._add(SlowProcessNode) for _ in range(self.manager.max_workers)]
+        fast = self._add(AddNode, 2.0, 3.0)
+
+        started = time.perf_counter()
+        self.engine.tick()
+        self.assertLess(time.perf_counter() - started, 0.8)
+
+        self.assertEqual(self._output(fast), 5.0)
+        self.assertEqual(self.manager.tick_stats["timed_out_nodes"], len(slow_nodes))
+        self.assertTrue(self.manager.wait_for_background(timeout=5))
+        for node_id in slow_nodes:
+            self.assertEqual(self._output(node_id), 3.0)
+
+
+if __name__ == "__main__":
+    unittest.main()